@@ -0,0 +1,50 @@
+import os
+import threading
+from contextlib import contextmanager
+
+
+@contextmanager
+def atomic_write(path, mode='wb', encoding=None):
+    '''
+    Open a temporary file next to path for the block to write; it replaces path in one os.replace
+    when the block finishes (and is removed if the block fails), so readers never see a half written file
+    '''
+    tmp_path = f'{path}.{os.getpid()}.{threading.get_ident()}.tmp'
+    try:
+        with open(tmp_path, mode, encoding=encoding) as f:
+            yield f
+        os.replace(tmp_path, path)
+    except BaseException:
+        remove_file(tmp_path)
+        raise
+
+
+def remove_file(path):
+    '''
+    os.remove that does not mind the file being gone already (removed by another session)
+    '''
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+
+def evict_lru(paths, max_bytes):
+    '''
+    Remove the least recently used of paths (by mtime, which the caches bump on every hit)
+    until the rest fits in max_bytes
+    '''
+    entries = []
+    for path in paths:
+        try:
+            stat = os.stat(path)
+        except FileNotFoundError:
+            continue
+        entries.append((stat.st_mtime, stat.st_size, path))
+
+    total = sum(size for _, size, _ in entries)
+    for _, size, path in sorted(entries):
+        if total <= max_bytes:
+            break
+        remove_file(path)
+        total -= size
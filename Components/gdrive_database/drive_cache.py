@@ -0,0 +1,88 @@
+import hashlib
+import os
+import threading
+from io import BytesIO
+
+import streamlit as st
+
+from Components.disk_files import atomic_write, evict_lru, remove_file
+
+# On-disk cache of downloaded Drive files, shared by every session and kept across restarts
+CACHE_DIR = os.path.join('.cache', 'drive_files')
+CACHE_MAX_BYTES = 1024 * 1024 * 1024  # 1 GB
+
+
+class driveFileCache:
+    '''
+    Content cache for Drive downloads keyed by (file id, modifiedTime).
+
+    Every entry is one file named <file id>.<version hash>.bin, so an edit on Drive
+    (new modifiedTime) simply misses and the old version gets replaced. The file
+    mtime is bumped on every hit and the least recently used entries are evicted
+    once the directory grows over max_bytes.
+    '''
+
+    def __init__(self, cache_dir=CACHE_DIR, max_bytes=CACHE_MAX_BYTES):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def _path(self, file_id, version):
+        digest = hashlib.sha1(str(version).encode('utf-8')).hexdigest()[:16]
+        return os.path.join(self.cache_dir, f'{file_id}.{digest}.bin')
+
+    def _entries(self):
+        for name in os.listdir(self.cache_dir):
+            if name.endswith('.bin'):
+                yield os.path.join(self.cache_dir, name)
+
+    def get(self, file_id, version):
+        '''
+        Return the cached bytes as BytesIO, or None when this version was never downloaded
+        '''
+        path = self._path(file_id, version)
+        try:
+            with open(path, 'rb') as f:
+                data = f.read()
+            os.utime(path)  # mark as recently used
+        except FileNotFoundError:
+            return None
+        return BytesIO(data)
+
+    def put(self, file_id, version, data):
+        '''
+        Store the downloaded bytes, replacing older versions of the same file
+        '''
+        path = self._path(file_id, version)
+        with atomic_write(path) as f:
+            f.write(data)
+
+        with self._lock:
+            for entry in self._entries():
+                if os.path.basename(entry).startswith(f'{file_id}.') and entry != path:
+                    remove_file(entry)
+            self.evict()
+
+    def remove(self, file_id):
+        '''
+        Drop every cached version of a file
+        '''
+        with self._lock:
+            for entry in self._entries():
+                if os.path.basename(entry).startswith(f'{file_id}.'):
+                    remove_file(entry)
+
+    def evict(self):
+        '''
+        Remove least recently used entries until the cache fits in max_bytes
+        '''
+        evict_lru(self._entries(), self.max_bytes)
+
+
+@st.cache_resource
+def get_file_cache(cache_dir=CACHE_DIR, max_bytes=CACHE_MAX_BYTES):
+    '''
+    One driveFileCache per process
+    '''
+    return driveFileCache(cache_dir, max_bytes)
@@ -0,0 +1,214 @@
+import queue
+import random
+import socket
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from contextlib import contextmanager
+from io import BytesIO
+
+import httplib2
+from google_auth_httplib2 import AuthorizedHttp
+from googleapiclient.discovery import build
+from googleapiclient.errors import HttpError
+from googleapiclient.http import MediaIoBaseDownload
+
+# Retry policy for Drive quota / server errors: exponential backoff with jitter
+MAX_RETRIES = 5
+BACKOFF_BASE = 0.5   # seconds
+BACKOFF_MAX = 32     # seconds
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+RATE_LIMIT_REASONS = {'rateLimitExceeded', 'userRateLimitExceeded', 'quotaExceeded', 'dailyLimitExceeded'}
+
+HTTP_TIMEOUT = 60  # seconds
+
+# Idle keep-alive connections kept for the next request; a busier moment opens extra ones, closed once done
+MAX_IDLE_CONNECTIONS = 8
+
+# Parallel downloads in download_many / run_many, run by one executor that lives as long as the client
+DOWNLOAD_WORKERS = 4
+
+
+def is_retryable(error):
+    '''
+    429 / 5xx always, 403 only when Drive says it is a rate limit (not a permission problem)
+    '''
+    if isinstance(error, HttpError):
+        if error.status_code in RETRY_STATUSES:
+            return True
+        if error.status_code == 403:
+            details = error.error_details if isinstance(error.error_details, list) else []
+            reasons = {detail.get('reason') for detail in details if isinstance(detail, dict)}
+            return bool(reasons & RATE_LIMIT_REASONS)
+        return False
+    return isinstance(error, (socket.timeout, ConnectionError, httplib2.HttpLib2Error))
+
+
+class driveClient:
+    '''
+    Drive v3 client shared by every page of the process.
+
+    The discovery document is loaded once (build), authorized httplib2 connections are kept in a
+    process-wide pool that every request borrows one from and gives back (httplib2 is not thread
+    safe, so a connection serves one request at a time; Streamlit runs every rerun on a new thread,
+    so a per-thread connection would never be reused), downloads in download_many run on one
+    long-lived executor, and every call goes through execute(), which retries quota / server
+    errors with exponential backoff and records request count and latency (see metrics()).
+
+    api_endpoint points the client at another server (e.g. benchmarks/fake_drive.py) instead of
+    https://www.googleapis.com/.
+    '''
+
+    def __init__(self, credentials, max_retries=MAX_RETRIES, api_endpoint=None, download_workers=DOWNLOAD_WORKERS):
+        self.credentials = credentials
+        self.max_retries = max_retries
+        self.download_workers = download_workers
+        client_options = {'api_endpoint': api_endpoint} if api_endpoint else None
+        self.service = build('drive', 'v3', credentials=credentials, cache_discovery=False, client_options=client_options)
+        self._connections = queue.Queue(maxsize=MAX_IDLE_CONNECTIONS)
+        self._executor = ThreadPoolExecutor(max_workers=download_workers, thread_name_prefix='drive-download')
+        self._metrics_lock = threading.Lock()
+        self._metrics = {}
+
+    @contextmanager
+    def _http(self):
+        '''
+        Borrow an idle connection from the pool (or open one) for one request, and give it back afterwards
+        '''
+        try:
+            http = self._connections.get_nowait()
+        except queue.Empty:
+            http = AuthorizedHttp(self.credentials, http=httplib2.Http(timeout=HTTP_TIMEOUT))
+        try:
+            yield http
+        finally:
+            try:
+                self._connections.put_nowait(http)
+            except queue.Full:
+                http.close()
+
+    def _record(self, operation, elapsed, failed=False, retried=False):
+        with self._metrics_lock:
+            stats = self._metrics.setdefault(operation, {
+                'requests': 0, 'errors': 0, 'retries': 0, 'latency_total': 0.0, 'latency_max': 0.0,
+            })
+            stats['requests'] += 1
+            stats['errors'] += failed
+            stats['retries'] += retried
+            stats['latency_total'] += elapsed
+            stats['latency_max'] = max(stats['latency_max'], elapsed)
+
+    def _with_retries(self, operation, call):
+        attempt = 0
+        while True:
+            start = time.perf_counter()
+            try:
+                result = call()
+            except Exception as error:
+                retry = attempt < self.max_retries and is_retryable(error)
+                self._record(operation, time.perf_counter() - start, failed=True, retried=retry)
+                if not retry:
+                    raise
+                # Full jitter so parallel sessions do not retry in lockstep
+                time.sleep(random.uniform(0, min(BACKOFF_MAX, BACKOFF_BASE * 2 ** attempt)))
+                attempt += 1
+                continue
+            self._record(operation, time.perf_counter() - start)
+            return result
+
+    def execute(self, request):
+        '''
+        Execute a request built from self.service (e.g. self.service.files().list(...))
+        '''
+        operation = getattr(request, 'methodId', None) or 'drive.request'
+
+        def call():
+            with self._http() as http:
+                return request.execute(http=http)
+
+        return self._with_retries(operation, call)
+
+    def download(self, file_id):
+        '''
+        Download a file's content into a BytesIO (whole download retried on failure)
+        '''
+        def fetch():
+            request = self.service.files().get_media(fileId=file_id)
+            file_data = BytesIO()
+            with self._http() as http:
+                request.http = http
+                downloader = MediaIoBaseDownload(file_data, request)
+                done = False
+                while not done:
+                    _, done = downloader.next_chunk()
+            file_data.seek(0)
+            return file_data
+
+        return self._with_retries('drive.files.get_media', fetch)
+
+    def download_many(self, file_ids, max_workers=DOWNLOAD_WORKERS):
+        '''
+        Download several files at most max_workers at a time, yielding (file_id, BytesIO) as each one finishes
+        (see run_many)
+        '''
+        return self.run_many(self.download, file_ids, max_workers)
+
+    def run_many(self, call, keys, max_workers=DOWNLOAD_WORKERS):
+        '''
+        Run call(key) for every key on the download executor, at most max_workers at a time (and never more
+        than the client's download_workers), yielding (key, result) as each one finishes.
+        The first calls are submitted before this returns, so they run while the caller does something else.
+        A failed call is raised to the caller once its turn comes; calls not started yet are cancelled
+        when the caller stops iterating.
+        '''
+        pending = iter(list(keys))
+        window = max(1, min(max_workers, self.download_workers))
+        futures = {}
+        self._submit(call, pending, window, futures)
+        return self._completed(call, pending, window, futures)
+
+    def _submit(self, call, pending, window, futures):
+        for key in pending:
+            futures[self._executor.submit(call, key)] = key
+            if len(futures) >= window:
+                return
+
+    def _completed(self, call, pending, window, futures):
+        try:
+            while futures:
+                done, _ = wait(futures, return_when=FIRST_COMPLETED)
+                for future in done:
+                    yield futures.pop(future), future.result()
+                    self._submit(call, pending, window, futures)
+        finally:
+            for future in futures:
+                future.cancel()
+
+    def close(self):
+        '''
+        Stop the download executor and close the idle connections
+        '''
+        self._executor.shutdown(wait=False, cancel_futures=True)
+        while True:
+            try:
+                self._connections.get_nowait().close()
+            except queue.Empty:
+                return
+
+    def metrics(self):
+        '''
+        {operation: {requests, errors, retries, latency_total, latency_avg, latency_max}} plus a 'total' row
+        '''
+        with self._metrics_lock:
+            snapshot = {operation: dict(stats) for operation, stats in self._metrics.items()}
+
+        total = {'requests': 0, 'errors': 0, 'retries': 0, 'latency_total': 0.0, 'latency_max': 0.0}
+        for stats in snapshot.values():
+            for key in ('requests', 'errors', 'retries', 'latency_total'):
+                total[key] += stats[key]
+            total['latency_max'] = max(total['latency_max'], stats['latency_max'])
+        snapshot['total'] = total
+
+        for stats in snapshot.values():
+            stats['latency_avg'] = stats['latency_total'] / stats['requests'] if stats['requests'] else 0.0
+        return snapshot
@@ -0,0 +1,142 @@
+import json
+import os
+import threading
+import time
+
+from googleapiclient.errors import HttpError
+
+from Components.disk_files import atomic_write
+from Components.gdrive_database.drive_client import is_retryable
+
+# Local snapshots of Drive folders, one JSON file per folder
+LISTING_DIR = os.path.join('.cache', 'drive_listing')
+
+# A full re-list now and then, in case a change was missed (e.g. a file moved in by someone else)
+FULL_SYNC_INTERVAL = 24 * 60 * 60
+
+# changes.list answers these when the start page token is invalid or expired
+INVALID_TOKEN_STATUSES = {400, 410}
+
+PAGE_SIZE = 1000
+LIST_FIELDS = 'nextPageToken, files(id, name, modifiedTime)'
+CHANGE_FIELDS = 'nextPageToken, newStartPageToken, changes(fileId, removed, file(id, name, modifiedTime, parents, trashed))'
+
+
+def list_all_files(client, folder_id):
+    '''
+    Every (non trashed) file in the folder, following nextPageToken until the last page
+    '''
+    files = []
+    page_token = None
+    while True:
+        results = client.execute(client.service.files().list(
+            q=f"'{folder_id}' in parents and trashed = false",
+            spaces='drive',
+            fields=LIST_FIELDS,
+            orderBy='modifiedTime desc',
+            pageSize=PAGE_SIZE,
+            pageToken=page_token
+        ))
+        files.extend(results.get('files', []))
+        page_token = results.get('nextPageToken')
+        if not page_token:
+            return files
+
+
+class folderListing:
+    '''
+    Snapshot of a Drive folder kept on disk and refreshed incrementally.
+
+    The first call lists the whole folder (all pages) and stores a start page token from
+    changes.getStartPageToken; later refreshes only ask changes.list for what happened since
+    that token and patch the snapshot, so a folder with thousands of files costs one small
+    request per refresh instead of a full listing.
+    '''
+
+    def __init__(self, client, folder_id, snapshot_dir=LISTING_DIR):
+        self.client = client
+        self.folder_id = folder_id
+        self.path = os.path.join(snapshot_dir, f'{folder_id}.json')
+        self._lock = threading.Lock()
+        os.makedirs(snapshot_dir, exist_ok=True)
+        self._snapshot = self._load()
+
+    def _load(self):
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (FileNotFoundError, ValueError):
+            return None
+
+    def _save(self):
+        with atomic_write(self.path, 'w', encoding='utf-8') as f:
+            json.dump(self._snapshot, f)
+
+    def _full_sync(self):
+        # Token first: anything changed while we list is replayed by the next refresh
+        service = self.client.service
+        start_page_token = self.client.execute(service.changes().getStartPageToken())['startPageToken']
+        files = list_all_files(self.client, self.folder_id)
+        self._snapshot = {
+            'start_page_token': start_page_token,
+            'synced_at': time.time(),
+            'files': {item['id']: item for item in files},
+        }
+        self._save()
+
+    def _apply_changes(self):
+        files = self._snapshot['files']
+        page_token = self._snapshot['start_page_token']
+        changed = False
+        while page_token:
+            results = self.client.execute(self.client.service.changes().list(
+                pageToken=page_token,
+                spaces='drive',
+                fields=CHANGE_FIELDS,
+                includeRemoved=True,
+                pageSize=PAGE_SIZE
+            ))
+
+            for change in results.get('changes', []):
+                item = change.get('file')
+                in_folder = (
+                    item is not None
+                    and not change.get('removed')
+                    and not item.get('trashed')
+                    and self.folder_id in item.get('parents', [])
+                )
+                if in_folder:
+                    files[item['id']] = {key: item[key] for key in ('id', 'name', 'modifiedTime')}
+                    changed = True
+                elif files.pop(change['fileId'], None) is not None:
+                    changed = True
+
+            if 'newStartPageToken' in results:
+                changed = changed or results['newStartPageToken'] != self._snapshot['start_page_token']
+                self._snapshot['start_page_token'] = results['newStartPageToken']
+            page_token = results.get('nextPageToken')
+
+        if changed:
+            self._save()
+
+    def files(self):
+        '''
+        [(name, id, modifiedTime), ...] newest first, same shape as the old get_list_files
+        '''
+        with self._lock:
+            if self._snapshot is None or time.time() - self._snapshot.get('synced_at', 0) > FULL_SYNC_INTERVAL:
+                self._full_sync()
+            else:
+                try:
+                    self._apply_changes()
+                except HttpError as error:
+                    if error.status_code in INVALID_TOKEN_STATUSES:
+                        # Expired / invalid page token: start over from a full listing
+                        self._full_sync()
+                    elif not is_retryable(error):
+                        raise
+                    # Quota / server errors the client already retried: a full listing would only add load,
+                    # serve the last snapshot and ask for the changes again on the next refresh
+
+            items = sorted(self._snapshot['files'].values(), key=lambda item: item['modifiedTime'], reverse=True)
+            return [(item['name'], item['id'], item['modifiedTime']) for item in items]
@@ -1,8 +1,17 @@
+from io import BytesIO
+
 import streamlit as st
 from google.oauth2 import service_account
-from googleapiclient.discovery import build
-from googleapiclient.http import MediaIoBaseDownload
-from io import BytesIO
+
+from Components.gdrive_database.drive_cache import get_file_cache
+from Components.gdrive_database.drive_client import DOWNLOAD_WORKERS, driveClient
+from Components.gdrive_database.drive_listing import folderListing
+from Components.single_flight import singleFlight
+
+# Folder listings are refreshed through changes.list at most this often (seconds)
+LISTING_TTL = 60
+# Listings kept in memory (one per folder, a few KB each)
+LISTING_ENTRIES = 16
 
 #
 # file = drive_api.get_list_files()
@@ -34,52 +43,105 @@ def authenticate(service_account_file, scopes):
     )
 
 @st.cache_resource
-def get_drive_service(_creds):
+def get_drive_client(service_account_file, scopes):
     '''
-    Initialize the Google Drive API service using provided credentials.
+    One Drive client (service, pooled connections, retries, metrics) per process, shared by every page and session.
     '''
-    return build('drive', 'v3', credentials=_creds)
+    return driveClient(authenticate(service_account_file, scopes))
 
-@st.cache_data
-def get_list_files(_service, parent_folder_id):
+@st.cache_resource
+def get_folder_listing(_client, parent_folder_id):
     '''
-    Retrieve a list of files from Google Drive, including names, file IDs, and last modified timestamps.
+    One incremental folderListing per folder per process.
     '''
-    results = _service.files().list(
-        q=f"'{parent_folder_id}' in parents",
-        spaces='drive',
-        fields='nextPageToken, files(id, name, modifiedTime)'
-    ).execute()
+    return folderListing(_client, parent_folder_id)
 
-    items = results.get('files', [])
-    return [
-        (item['name'], item['id'], item['modifiedTime']) for item in items
-    ] if items else []
+@st.cache_resource
+def get_download_flights():
+    '''
+    Downloads in progress per (file id, modifiedTime), shared by every session of the process.
+    '''
+    return singleFlight()
+
+@st.cache_data(ttl=LISTING_TTL, max_entries=LISTING_ENTRIES)
+def get_list_files(_client, parent_folder_id):
+    '''
+    Retrieve a list of files from Google Drive, including names, file IDs, and last modified timestamps.
+    All pages are followed; later calls only fetch the changes since the previous one.
+    '''
+    return get_folder_listing(_client, parent_folder_id).files()
 
 class googleConnect:
     def __init__(self, service_account_file, scopes, parent_folder_id):
         self.service_account_file = service_account_file
         self.scopes = scopes
         self.parent_folder_id = parent_folder_id
-        self.creds = authenticate(service_account_file, scopes)
-        self.service = get_drive_service(self.creds)
+        self.client = get_drive_client(service_account_file, scopes)
+        self.creds = self.client.credentials
+        self.service = self.client.service
+        # Resolved here, on the script thread: bulk reads use them from the client's download threads
+        self.file_cache = get_file_cache()
+        self.download_flights = get_download_flights()
 
     def get_list_files(self):
         '''
         Wrapper for get_list_files function.
         '''
-        return get_list_files(self.service, self.parent_folder_id)
+        return get_list_files(self.client, self.parent_folder_id)
 
-    def read_file_from_drive(self, file_id):
+    def refresh_list_files(self):
+        '''
+        Drop the cached listing of this folder only; the next get_list_files asks Drive for the changes.
+        '''
+        get_list_files.clear(self.client, self.parent_folder_id)
+
+    def forget_file(self, file_id):
+        '''
+        Drop every cached download of one file, so the next read downloads it again.
+        '''
+        self.file_cache.remove(file_id)
+
+    def read_file_from_drive(self, file_id, modified_time=None):
         '''
         Read an Excel file from Google Drive.
+        With modified_time (from get_list_files) the bytes are served from the on-disk cache when unchanged,
+        and sessions asking for the same version at the same time share one download.
+        Every caller gets its own BytesIO.
+        '''
+        if modified_time is None:
+            return self.client.download(file_id)
+        data = self.download_flights.do((file_id, modified_time), lambda: self._read_version(file_id, modified_time))
+        return BytesIO(data)
+
+    def _read_version(self, file_id, modified_time):
+        '''
+        Bytes of one version of a file, from the on-disk cache or downloaded (and cached)
         '''
-        request = self.service.files().get_media(fileId=file_id)
-        file_data = BytesIO()
-        downloader = MediaIoBaseDownload(file_data, request)
-        done = False
-        while not done:
-            _, done = downloader.next_chunk()
-
-        file_data.seek(0)
-        return file_data
\ No newline at end of file
+        cached = self.file_cache.get(file_id, modified_time)
+        if cached is not None:
+            return cached.getvalue()
+
+        data = self.client.download(file_id).getvalue()
+        self.file_cache.put(file_id, modified_time, data)
+        return data
+
+    def read_files_from_drive(self, files, max_workers=DOWNLOAD_WORKERS):
+        '''
+        Bulk version of read_file_from_drive.
+        files is a list of (file_id, modified_time); yields (file_id, file_data) as soon as each file is ready.
+        Files missing from the on-disk cache start downloading (at most max_workers at a time) before the
+        cached ones are yielded, and go through the same per-version single flight as read_file_from_drive.
+        '''
+        cached = []
+        missing = []
+        for file_id, modified_time in files:
+            file_data = self.file_cache.get(file_id, modified_time) if modified_time is not None else None
+            if file_data is not None:
+                cached.append((file_id, file_data))
+            else:
+                missing.append((file_id, modified_time))
+
+        downloads = self.client.run_many(lambda file: self.read_file_from_drive(*file), missing, max_workers)
+        yield from cached
+        for (file_id, _), file_data in downloads:
+            yield file_id, file_data
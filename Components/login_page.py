@@ -1,10 +1,12 @@
 # qa_projectx_app.py
 
 import streamlit as st
-import pandas as pd
-import os
 import re
 
+from Components.memory_cache import display_memory_panel
+from Components.timing import display_timing_panel, span
+from Components.user_store import USER_DB, get_user_store
+
 # how to use this in app.py
 # from Components.login_page import loginPage
 
@@ -15,10 +17,11 @@ import re
 
 class loginPage:
     
-    # THIS IS THE AREA OF HOW LOGIN LOGOUT USING CSV FILE WORK
+    # THIS IS THE AREA OF HOW LOGIN LOGOUT WORK (users are stored in SQLite, user_data.csv is migrated on first start)
     
-    def __init__(self, csv_file='user_data.csv'):
+    def __init__(self, csv_file='user_data.csv', db_file=USER_DB):
         self.csv_file = csv_file
+        self.db_file = db_file
         self.initialize_session_state()
 
     def initialize_session_state(self):
@@ -31,17 +34,11 @@ class loginPage:
         if 'active_page' not in st.session_state:
             st.session_state['active_page'] = None
 
-    def save_to_csv(self, username, email, password, role='guest'):
-        data = pd.DataFrame({
-            'Username': [username],
-            'Email': [email],
-            'Password': [password],
-            'Role': [role]
-        })
-        if os.path.exists(self.csv_file):
-            data.to_csv(self.csv_file, mode='a', header=False, index=False)
-        else:
-            data.to_csv(self.csv_file, mode='w', header=True, index=False)
+    def save_user(self, username, email, password, role='guest'):
+        '''
+        Returns False when the email got registered in the meantime
+        '''
+        return get_user_store(self.db_file, self.csv_file).add_user(username, email, password, role)
 
     @staticmethod
     def is_valid_email(email):
@@ -57,23 +54,10 @@ class loginPage:
         return has_letter and has_number
 
     def validate_user(self, username, password):
-        if os.path.isfile(self.csv_file):
-            data = pd.read_csv(self.csv_file)
-            data['Username'] = data['Username'].astype(str).str.strip()
-            data['Password'] = data['Password'].astype(str).str.strip()
-            username = username.strip().lower()
-            password = password.strip()
-            user_record = data[(data['Username'].str.lower() == username) & \
-                               (data['Password'] == password)]
-            if not user_record.empty:
-                return user_record.iloc[0]['Role']
-        return None
+        return get_user_store(self.db_file, self.csv_file).validate_user(username, password)
 
     def is_email_registered(self, email):
-        if os.path.isfile(self.csv_file):
-            data = pd.read_csv(self.csv_file)
-            return email in data['Email'].values
-        return False
+        return get_user_store(self.db_file, self.csv_file).is_email_registered(email)
 
     # Rerun the page after logout in order to clear the cookies
     def logout(self):
@@ -84,7 +68,8 @@ class loginPage:
         st.rerun()
 
     def login(self, username, password):
-        role = self.validate_user(username, password)
+        with span('validate_user'):
+            role = self.validate_user(username, password)
         if role:
             st.session_state['is_logged_in'] = True
             st.session_state['role'] = role
@@ -117,10 +102,16 @@ class loginPage:
 
         selected_page = st.sidebar.selectbox("Menu", pages)
 
+        # Stage timings and memory cache usage of the pages, admins only
+        if role == 'admin':
+            display_timing_panel()
+            display_memory_panel()
+
         if selected_page == "Logout":
             self.logout()
         else:
-            self.handle_page_selection(selected_page)
+            with span('page', page=selected_page):
+                self.handle_page_selection(selected_page)
 
     def display_logged_out_view(self):
         tab1, tab2 = st.tabs(['Login', 'Sign Up'])
@@ -158,8 +149,10 @@ class loginPage:
                         st.error('Email already registered. Please use a different email.')
                     elif self.is_valid_email(email):
                         if self.is_valid_password(password):
-                            self.save_to_csv(username, email, password)
-                            st.success("You have successfully signed up! Your role is 'Guest'. Please contact the admin to update your role.")
+                            if not self.save_user(username, email, password):
+                                st.error('Email already registered. Please use a different email.')
+                            else:
+                                st.success("You have successfully signed up! Your role is 'Guest'. Please contact the admin to update your role.")
                         else:
                             st.error('Password must be at least 6 characters long and contain both letters and numbers')
                     else:
@@ -0,0 +1,228 @@
+import os
+import sys
+import threading
+from collections import OrderedDict
+from io import BytesIO
+
+import streamlit as st
+
+from Components.single_flight import singleFlight
+
+# In-memory cache of workbooks, processed frames and built figures, shared by every session of the process.
+# PTR_MEMORY_CACHE_MB overrides the budget, e.g. to fit it under the pod's memory limit
+MEMORY_CACHE_ENV = 'PTR_MEMORY_CACHE_MB'
+MEMORY_CACHE_MAX_BYTES = 512 * 1024 * 1024  # 512 MB
+
+
+def size_of(value):
+    '''
+    Memory held by a cached value in bytes: buffers by their length, DataFrames / Series / Index
+    with memory_usage(deep=True), containers by their items, objects with an nbytes attribute or
+    method (numpy arrays, ptrWorkbook) by that, anything else by sys.getsizeof.
+    pandas objects are recognised by their memory_usage method, so this module does not import pandas
+    '''
+    if isinstance(value, (bytes, bytearray)):
+        return len(value)
+    if isinstance(value, BytesIO):
+        with value.getbuffer() as buffer:
+            return buffer.nbytes
+    memory_usage = getattr(value, 'memory_usage', None)
+    if callable(memory_usage):
+        usage = memory_usage(deep=True)  # per column for a DataFrame (index included), a number otherwise
+        return int(usage.sum()) if hasattr(usage, 'sum') else int(usage)
+    if isinstance(value, (tuple, list, set, frozenset)):
+        return sys.getsizeof(value) + sum(size_of(item) for item in value)
+    if isinstance(value, dict):
+        return sys.getsizeof(value) + sum(size_of(key) + size_of(item) for key, item in value.items())
+    size = getattr(value, 'nbytes', None)
+    if callable(size):
+        size = size()
+    if isinstance(size, int):
+        return size
+    return sys.getsizeof(value)
+
+
+class memoryCache:
+    '''
+    LRU cache bounded by the bytes its values hold rather than by the number of entries.
+
+    Keys are tuples (kind, file id, modifiedTime, ...), e.g. ('sheet', file_id, modified_time,
+    sheet_name); a new modifiedTime is a new key, and remove() drops every entry of one file
+    (version). Each value is measured with size_of() when it is stored, or again with resize()
+    when it grows (a workbook parsing more sheets); least recently used entries are evicted
+    until the total fits in max_bytes, and a value larger than the whole budget is not kept.
+    Concurrent misses on one key are coalesced: a single load runs and every caller gets its value.
+    Values are shared by every session: callers never modify them.
+    '''
+
+    def __init__(self, max_bytes=MEMORY_CACHE_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()  # key -> [value, bytes]
+        self._bytes = 0
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._flights = singleFlight()
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self._misses += 1
+                return default
+            self._entries.move_to_end(key)
+            self._hits += 1
+            return entry[0]
+
+    def put(self, key, value, size=None):
+        '''
+        Store value under key (size in bytes measured with size_of() when not given) and evict down to the budget
+        '''
+        size = size_of(value) if size is None else size
+        with self._lock:
+            self._discard(key)
+            if size > self.max_bytes:
+                return value
+            self._entries[key] = [value, size]
+            self._bytes += size
+            self._evict()
+        return value
+
+    def get_or_load(self, key, load, measure=size_of):
+        '''
+        Cached value of key, loaded with load() and stored on a miss (charged measure(value) bytes).
+        Callers missing the same key while the load runs wait for it instead of loading again
+        '''
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self._hits += 1
+                return entry[0]
+            self._misses += 1
+        return self._flights.do(key, lambda: self._load(key, load, measure))
+
+    def _load(self, key, load, measure):
+        # Stored by a load that finished between our miss and joining the flight
+        with self._lock:
+            entry = self._entries.get(key)
+        if entry is not None:
+            return entry[0]
+        value = load()
+        return self.put(key, value, measure(value))
+
+    def resize(self, key):
+        '''
+        Measure the value of key again after it grew in place, evicting others if it no longer fits
+        '''
+        with self._lock:
+            entry = self._entries.get(key)
+        if entry is None:
+            return
+        size = size_of(entry[0])
+        with self._lock:
+            if self._entries.get(key) is not entry:
+                return  # replaced or dropped meanwhile
+            self._bytes += size - entry[1]
+            entry[1] = size
+            if size > self.max_bytes:
+                self._discard(key)
+            self._evict(keep=key)
+
+    def remove(self, file_id, modified_time=None):
+        '''
+        Drop the entries of a file, of one modifiedTime or of every version
+        '''
+        with self._lock:
+            for key in list(self._entries):
+                if key[1] == file_id and (modified_time is None or key[2] == modified_time):
+                    self._discard(key)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def _discard(self, key):
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._bytes -= entry[1]
+
+    def _evict(self, keep=None):
+        while self._bytes > self.max_bytes and self._entries:
+            key = next(iter(self._entries))
+            if key == keep:
+                # the entry that just grew is the most useful one, drop the least recently used after it
+                self._entries.move_to_end(key)
+                if len(self._entries) == 1:
+                    break
+                continue
+            self._discard(key)
+            self._evictions += 1
+
+    def stats(self):
+        '''
+        Hits, misses (coalesced: misses served by a concurrent load), hit rate, evictions,
+        entries and bytes (in total and per kind of key)
+        '''
+        with self._lock:
+            kinds = {}
+            for key, (_, size) in self._entries.items():
+                kind = kinds.setdefault(key[0], {'entries': 0, 'bytes': 0})
+                kind['entries'] += 1
+                kind['bytes'] += size
+            lookups = self._hits + self._misses
+            return {
+                'hits': self._hits,
+                'misses': self._misses,
+                'coalesced': self._flights.coalesced,
+                'hit_rate': self._hits / lookups if lookups else None,
+                'evictions': self._evictions,
+                'entries': len(self._entries),
+                'bytes': self._bytes,
+                'max_bytes': self.max_bytes,
+                'kinds': kinds,
+            }
+
+
+def memory_budget():
+    '''
+    Byte budget of the memory cache: PTR_MEMORY_CACHE_MB when set, MEMORY_CACHE_MAX_BYTES otherwise
+    '''
+    budget = os.environ.get(MEMORY_CACHE_ENV)
+    return int(float(budget) * 1024 * 1024) if budget else MEMORY_CACHE_MAX_BYTES
+
+
+@st.cache_resource
+def get_memory_cache(max_bytes=None):
+    '''
+    One memoryCache per process
+    '''
+    return memoryCache(memory_budget() if max_bytes is None else max_bytes)
+
+
+def display_memory_panel():
+    '''
+    Sidebar panel for admins: memory cache size against its budget, hit rate, evictions, bytes per kind
+    '''
+    stats = get_memory_cache().stats()
+    with st.sidebar.expander('Memory cache', icon=':material/memory:'):
+        st.progress(
+            min(stats['bytes'] / stats['max_bytes'], 1.0),
+            text=f"{stats['bytes'] / 2 ** 20:.1f} / {stats['max_bytes'] / 2 ** 20:.0f} MB in {stats['entries']} entries"
+        )
+        hit_rate = '-' if stats['hit_rate'] is None else f"{stats['hit_rate']:.1%}"
+        st.caption(
+            f"Hit rate {hit_rate} ({stats['hits']} hits, {stats['misses']} misses of which {stats['coalesced']} "
+            f"waited for a concurrent load), {stats['evictions']} evictions"
+        )
+        if stats['kinds']:
+            st.dataframe(
+                [{'Kind': kind, 'Entries': kind_stats['entries'], 'MB': kind_stats['bytes'] / 2 ** 20}
+                 for kind, kind_stats in sorted(stats['kinds'].items())],
+                hide_index=True, use_container_width=True
+            )
+        if st.button('Clear memory cache'):
+            get_memory_cache().clear()
+            st.rerun()
@@ -0,0 +1,56 @@
+import threading
+
+
+class _call:
+    __slots__ = ('done', 'value', 'error')
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.value = None
+        self.error = None
+
+
+class singleFlight:
+    '''
+    Coalesce concurrent calls for the same key: the first caller runs the load, callers arriving
+    while it runs wait for it and get its result (or its exception) instead of loading again.
+
+    Only calls that overlap are coalesced, nothing is kept once the load returns. When the first
+    caller is interrupted by a BaseException (st.stop / st.rerun of its own session) the waiting
+    callers are not: one of them runs the load instead.
+    '''
+
+    def __init__(self):
+        self._calls = {}
+        self._lock = threading.Lock()
+        self.coalesced = 0  # calls answered by another caller's load
+
+    def do(self, key, load):
+        while True:
+            with self._lock:
+                call = self._calls.get(key)
+                leader = call is None
+                if leader:
+                    call = self._calls[key] = _call()
+                else:
+                    self.coalesced += 1
+
+            if leader:
+                try:
+                    call.value = load()
+                    return call.value
+                except BaseException as error:
+                    call.error = error
+                    raise
+                finally:
+                    with self._lock:
+                        del self._calls[key]
+                    call.done.set()
+
+            call.done.wait()
+            if call.error is None:
+                return call.value
+            if isinstance(call.error, Exception):
+                raise call.error
+            with self._lock:
+                self.coalesced -= 1  # the leader was interrupted, try again
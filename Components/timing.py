@@ -0,0 +1,211 @@
+import json
+import os
+import threading
+import time
+from collections import deque
+from contextlib import nullcontext
+
+import streamlit as st
+
+from Components.disk_files import atomic_write
+
+# Timing spans are off unless PTR_TIMING=1 is set (or an admin switches them on in the sidebar)
+TIMING_ENV = 'PTR_TIMING'
+
+# Exports: one JSON line per span, and a Prometheus text file (for node_exporter's textfile collector)
+EXPORT_DIR = os.path.join('.cache', 'timing')
+SPANS_FILE = 'spans.jsonl'
+PROMETHEUS_FILE = 'ptr_timing.prom'
+
+RECENT_SPANS = 2000  # kept in memory for the sidebar panel
+PENDING_SPANS = 200  # written to the JSON lines file at the latest after this many
+BUCKETS = [0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30]
+
+# Returned by span() while timing is off: entering it costs next to nothing
+NO_SPAN = nullcontext()
+
+
+class _span:
+    __slots__ = ('recorder', 'stage', 'tags', 'start')
+
+    def __init__(self, recorder, stage, tags):
+        self.recorder = recorder
+        self.stage = stage
+        self.tags = tags
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, traceback):
+        # st.stop / st.rerun unwind with BaseExceptions, they are not failures
+        failed = exc_type is not None and issubclass(exc_type, Exception)
+        self.recorder.record(self.stage, time.perf_counter() - self.start, self.tags, failed=failed)
+
+
+class spanRecorder:
+    '''
+    Timing spans of the page stages, shared by every session of the process.
+
+    Spans are kept in a ring buffer for the sidebar panel, aggregated per stage into a histogram for
+    the Prometheus file, and appended to the JSON lines file by flush() (or once PENDING_SPANS wait).
+    '''
+
+    def __init__(self, enabled=False, export_dir=EXPORT_DIR):
+        self.enabled = enabled
+        self.export_dir = export_dir
+        self.recent = deque(maxlen=RECENT_SPANS)
+        self.drive_metrics = None  # last Drive client counters handed to flush()
+        self.cache_stats = None  # last memory cache stats handed to flush()
+        self._pending = []
+        self._histograms = {}
+        self._lock = threading.Lock()
+
+    def record(self, stage, seconds, tags=None, failed=False):
+        entry = {'ts': time.time(), 'stage': stage, 'seconds': seconds, 'failed': failed, **(tags or {})}
+        with self._lock:
+            self.recent.append(entry)
+            self._pending.append(entry)
+            histogram = self._histograms.setdefault(stage, {'buckets': [0] * len(BUCKETS), 'sum': 0.0, 'count': 0})
+            for position, bound in enumerate(BUCKETS):
+                if seconds <= bound:
+                    histogram['buckets'][position] += 1
+            histogram['sum'] += seconds
+            histogram['count'] += 1
+            flush_now = len(self._pending) >= PENDING_SPANS
+        if flush_now:
+            self.write_spans()
+
+    def write_spans(self):
+        '''
+        Append the spans recorded since the last call to the JSON lines file
+        '''
+        with self._lock:
+            pending, self._pending = self._pending, []
+        if not pending:
+            return
+        os.makedirs(self.export_dir, exist_ok=True)
+        with open(os.path.join(self.export_dir, SPANS_FILE), 'a', encoding='utf-8') as f:
+            f.write(''.join(json.dumps(entry, default=str) + '\n' for entry in pending))
+
+    def prometheus_text(self, drive_metrics=None, cache_stats=None):
+        '''
+        Stage histograms (and the Drive client counters / memory cache stats, when given) in the Prometheus text format
+        '''
+        with self._lock:
+            histograms = {stage: dict(histogram, buckets=list(histogram['buckets'])) for stage, histogram in self._histograms.items()}
+
+        lines = [
+            '# HELP ptr_stage_seconds Time spent in each stage of the PTR app',
+            '# TYPE ptr_stage_seconds histogram',
+        ]
+        for stage, histogram in sorted(histograms.items()):
+            for bound, count in zip(BUCKETS, histogram['buckets']):
+                lines.append(f'ptr_stage_seconds_bucket{{stage="{stage}",le="{bound}"}} {count}')
+            lines.append(f'ptr_stage_seconds_bucket{{stage="{stage}",le="+Inf"}} {histogram["count"]}')
+            lines.append(f'ptr_stage_seconds_sum{{stage="{stage}"}} {histogram["sum"]}')
+            lines.append(f'ptr_stage_seconds_count{{stage="{stage}"}} {histogram["count"]}')
+
+        if drive_metrics:
+            operations = {operation: stats for operation, stats in drive_metrics.items() if operation != 'total'}
+            for name, key, kind, text in [
+                ('ptr_drive_requests_total', 'requests', 'counter', 'Drive API requests'),
+                ('ptr_drive_errors_total', 'errors', 'counter', 'Drive API requests that failed'),
+                ('ptr_drive_retries_total', 'retries', 'counter', 'Drive API requests that were retried'),
+                ('ptr_drive_latency_seconds_total', 'latency_total', 'counter', 'Time spent in Drive API requests'),
+                ('ptr_drive_latency_seconds_max', 'latency_max', 'gauge', 'Slowest Drive API request'),
+            ]:
+                lines += [f'# HELP {name} {text}', f'# TYPE {name} {kind}']
+                lines += [f'{name}{{operation="{operation}"}} {stats[key]}' for operation, stats in sorted(operations.items())]
+
+        if cache_stats:
+            for name, key, kind, text in [
+                ('ptr_memory_cache_bytes', 'bytes', 'gauge', 'Bytes held by the memory cache'),
+                ('ptr_memory_cache_max_bytes', 'max_bytes', 'gauge', 'Byte budget of the memory cache'),
+                ('ptr_memory_cache_entries', 'entries', 'gauge', 'Entries in the memory cache'),
+                ('ptr_memory_cache_hits_total', 'hits', 'counter', 'Memory cache lookups that hit'),
+                ('ptr_memory_cache_misses_total', 'misses', 'counter', 'Memory cache lookups that missed'),
+                ('ptr_memory_cache_coalesced_total', 'coalesced', 'counter', 'Misses served by a concurrent load of the same key'),
+                ('ptr_memory_cache_evictions_total', 'evictions', 'counter', 'Entries evicted to stay in the budget'),
+            ]:
+                lines += [f'# HELP {name} {text}', f'# TYPE {name} {kind}', f'{name} {cache_stats[key]}']
+        return '\n'.join(lines) + '\n'
+
+    def write_prometheus(self, drive_metrics=None, cache_stats=None):
+        os.makedirs(self.export_dir, exist_ok=True)
+        path = os.path.join(self.export_dir, PROMETHEUS_FILE)
+        with atomic_write(path, 'w', encoding='utf-8') as f:  # the collector never reads a half written file
+            f.write(self.prometheus_text(drive_metrics, cache_stats))
+
+    def flush(self, drive_metrics=None, cache_stats=None):
+        '''
+        Write both exports; a no-op while timing is off
+        '''
+        if not self.enabled:
+            return
+        self.drive_metrics = drive_metrics or self.drive_metrics
+        self.cache_stats = cache_stats or self.cache_stats
+        self.write_spans()
+        self.write_prometheus(self.drive_metrics, self.cache_stats)
+
+    def summary(self):
+        '''
+        Per stage count / p50 / p95 / max / total seconds over the recent spans, slowest total first
+        '''
+        with self._lock:
+            recent = list(self.recent)
+        by_stage = {}
+        for entry in recent:
+            by_stage.setdefault(entry['stage'], []).append(entry['seconds'])
+        rows = []
+        for stage, seconds in by_stage.items():
+            seconds.sort()
+            rows.append({
+                'Stage': stage,
+                'Count': len(seconds),
+                'p50 (ms)': seconds[len(seconds) // 2] * 1000,
+                'p95 (ms)': seconds[min(len(seconds) - 1, int(len(seconds) * 0.95))] * 1000,
+                'Max (ms)': seconds[-1] * 1000,
+                'Total (s)': sum(seconds),
+            })
+        return sorted(rows, key=lambda row: row['Total (s)'], reverse=True)
+
+
+# One recorder per process; a module global rather than st.cache_resource so a disabled span()
+# is a single attribute check
+recorder = spanRecorder(enabled=os.environ.get(TIMING_ENV) == '1')
+
+
+def span(stage, **tags):
+    '''
+    Context manager timing one stage, tags (file, sheet, version, ...) go along with the span:
+    with span('processing_excel', file=file_id, sheet=sheet_name): ...
+    '''
+    if not recorder.enabled:
+        return NO_SPAN
+    return _span(recorder, stage, tags)
+
+
+def display_timing_panel():
+    '''
+    Sidebar panel for admins: switch timing on / off, per stage summary, recent spans, Drive counters, exports
+    '''
+    with st.sidebar.expander('Timing', icon=':material/timer:'):
+        recorder.enabled = st.toggle('Record timing spans', value=recorder.enabled)
+        if not recorder.recent:
+            st.caption(f'No spans recorded yet (set {TIMING_ENV}=1 to record from startup).')
+            return
+
+        st.dataframe(recorder.summary(), hide_index=True, use_container_width=True)
+        st.caption('Recent spans')
+        st.dataframe(list(recorder.recent)[-50:][::-1], hide_index=True, use_container_width=True)
+        if recorder.drive_metrics:
+            st.caption('Drive API')
+            st.dataframe(
+                [{'Operation': operation, **stats} for operation, stats in recorder.drive_metrics.items()],
+                hide_index=True, use_container_width=True
+            )
+        if st.button('Export now'):
+            recorder.write_spans()
+            recorder.write_prometheus(recorder.drive_metrics, recorder.cache_stats)
+            st.caption(f'Written to {recorder.export_dir}')
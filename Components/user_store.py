@@ -0,0 +1,181 @@
+import os
+import sqlite3
+import threading
+from contextlib import contextmanager
+
+import streamlit as st
+
+# Users live in SQLite (WAL mode); the old CSV is only read once, to fill an empty database
+USER_DB = 'user_data.db'
+USER_CSV = 'user_data.csv'
+
+# Column names shown in the app (same as the old CSV header) -> table columns
+COLUMNS = {'Username': 'username', 'Email': 'email', 'Password': 'password', 'Role': 'role'}
+
+SCHEMA = '''
+CREATE TABLE IF NOT EXISTS users (
+    id INTEGER PRIMARY KEY,
+    username TEXT,
+    email TEXT,
+    password TEXT,
+    role TEXT,
+    username_key TEXT
+);
+CREATE INDEX IF NOT EXISTS users_username_key ON users(username_key);
+CREATE INDEX IF NOT EXISTS users_email ON users(email);
+'''
+
+BUSY_TIMEOUT = 5000  # ms a writer waits for another one before failing
+
+
+def username_key(username):
+    '''
+    Login lookups are case insensitive and ignore surrounding spaces
+    '''
+    return str(username).strip().lower() if username is not None else None
+
+
+class userStore:
+    '''
+    User accounts in a SQLite database shared by the login page and the admin page.
+
+    Every write is one transaction (sign ups and admin saves cannot interleave and corrupt the
+    data like appends / rewrites of the CSV could), WAL mode lets logins read while someone writes,
+    and logins / sign up checks are index lookups on the lowercased username and on the email.
+    Each thread gets its own connection.
+    '''
+
+    def __init__(self, db_file=USER_DB, csv_file=USER_CSV):
+        self.db_file = db_file
+        self.csv_file = csv_file
+        self._local = threading.local()
+        connection = self._connection()
+        connection.execute('PRAGMA journal_mode=WAL')
+        connection.executescript(SCHEMA)
+        self._migrate_csv()
+
+    def _connection(self):
+        if not hasattr(self._local, 'connection'):
+            # Autocommit mode, transactions are opened explicitly with BEGIN IMMEDIATE
+            connection = sqlite3.connect(self.db_file, isolation_level=None, check_same_thread=False)
+            connection.execute(f'PRAGMA busy_timeout={BUSY_TIMEOUT}')
+            connection.execute('PRAGMA synchronous=NORMAL')
+            self._local.connection = connection
+        return self._local.connection
+
+    @contextmanager
+    def _transaction(self):
+        '''
+        BEGIN IMMEDIATE ... COMMIT, rolled back when the block raises
+        '''
+        connection = self._connection()
+        connection.execute('BEGIN IMMEDIATE')
+        try:
+            yield connection
+        except BaseException:
+            connection.execute('ROLLBACK')
+            raise
+        connection.execute('COMMIT')
+
+    def _migrate_csv(self):
+        if not os.path.isfile(self.csv_file):
+            return
+        with self._transaction() as connection:
+            if connection.execute('SELECT 1 FROM users LIMIT 1').fetchone():
+                return
+            # pandas only for this one-off import (and the admin table), the login path does not need it
+            import pandas as pd
+
+            # dtype=str keeps passwords like 123456 exactly as written in the file
+            data = pd.read_csv(self.csv_file, dtype=str)
+            data = data.astype(object).where(data.notna(), None)
+            connection.executemany(
+                'INSERT INTO users (username, email, password, role, username_key) VALUES (?, ?, ?, ?, ?)',
+                [
+                    (row.Username, row.Email, row.Password, row.Role, username_key(row.Username))
+                    for row in data.itertuples(index=False)
+                ]
+            )
+
+    def validate_user(self, username, password):
+        '''
+        Role of the first user matching username (case insensitive) and password, None otherwise
+        '''
+        rows = self._connection().execute(
+            'SELECT password, role FROM users WHERE username_key = ? ORDER BY id', (username_key(username),)
+        )
+        password = password.strip()
+        for user_password, role in rows:
+            if user_password is not None and user_password.strip() == password:
+                return role
+        return None
+
+    def is_email_registered(self, email):
+        return self._connection().execute('SELECT 1 FROM users WHERE email = ? LIMIT 1', (email,)).fetchone() is not None
+
+    def add_user(self, username, email, password, role='guest'):
+        '''
+        Insert a user unless the email is already registered (checked in the same transaction), returns True when added
+        '''
+        with self._transaction() as connection:
+            if connection.execute('SELECT 1 FROM users WHERE email = ? LIMIT 1', (email,)).fetchone():
+                return False
+            connection.execute(
+                'INSERT INTO users (username, email, password, role, username_key) VALUES (?, ?, ?, ?, ?)',
+                (username, email, password, role, username_key(username))
+            )
+        return True
+
+    def count_users(self):
+        return self._connection().execute('SELECT COUNT(*) FROM users').fetchone()[0]
+
+    def load_page(self, offset, limit):
+        '''
+        One page of users (in insertion order) as a DataFrame with the CSV columns, indexed by user id
+        '''
+        import pandas as pd
+
+        rows = self._connection().execute(
+            'SELECT id, username, email, password, role FROM users ORDER BY id LIMIT ? OFFSET ?', (limit, offset)
+        ).fetchall()
+        data = pd.DataFrame(rows, columns=['id', *COLUMNS]).set_index('id')
+        return data.astype(object)
+
+    def apply_changes(self, row_ids, edited_rows=None, added_rows=None, deleted_rows=None):
+        '''
+        Persist a st.data_editor diff in one transaction.
+        row_ids are the user ids of the rows shown in the editor (row positions in the diff refer to them);
+        edited_rows {position: {column: value}}, added_rows [{column: value}], deleted_rows [position].
+        Only the touched rows and columns are written.
+        '''
+        deleted = {row_ids[position] for position in deleted_rows or []}
+        with self._transaction() as connection:
+            for position, changes in (edited_rows or {}).items():
+                user_id = row_ids[int(position)]
+                changes = {column: value for column, value in changes.items() if column in COLUMNS}
+                if user_id in deleted or not changes:
+                    continue
+                assignments = [f'{COLUMNS[column]} = ?' for column in changes]
+                values = list(changes.values())
+                if 'Username' in changes:
+                    assignments.append('username_key = ?')
+                    values.append(username_key(changes['Username']))
+                connection.execute(f"UPDATE users SET {', '.join(assignments)} WHERE id = ?", (*values, user_id))
+
+            connection.executemany('DELETE FROM users WHERE id = ?', [(user_id,) for user_id in deleted])
+
+            connection.executemany(
+                'INSERT INTO users (username, email, password, role, username_key) VALUES (?, ?, ?, ?, ?)',
+                [
+                    (row.get('Username'), row.get('Email'), row.get('Password'), row.get('Role'), username_key(row.get('Username')))
+                    for row in added_rows or []
+                ]
+            )
+
+
+@st.cache_resource
+def get_user_store(db_file=USER_DB, csv_file=USER_CSV):
+    '''
+    One userStore per database per process
+    '''
+    return userStore(db_file, csv_file)
@@ -1,29 +1,50 @@
 import streamlit as st
-import pandas as pd
-import os
+import math
 
-CSV_FILE = 'user_data.csv'
+from Components.user_store import get_user_store
+
+# Users shown (and sent to the browser) per page of the editor
+PAGE_SIZE = 50
+
+VALID_ROLES = ['admin', 'tester', 'viewer', 'guest']
+
+def invalid_roles(changes):
+    '''
+    Roles in the edited / added rows of a data_editor diff that are not in VALID_ROLES
+    '''
+    roles = [row['Role'] for row in changes['edited_rows'].values() if 'Role' in row]
+    roles += [row.get('Role') for row in changes['added_rows']]
+    return [role for role in roles if role not in VALID_ROLES]
 
 def display_admin_page():
     st.title(":orange[Manage Users]")
 
-    # Check if the CSV file exists
-    if os.path.exists(CSV_FILE):
-        # Load user data from the CSV file
-        data = pd.read_csv(CSV_FILE)
-        st.write("Edit user roles in the table below and click 'Save changes'.")
-
-        edited_data = st.data_editor(data, use_container_width=True, num_rows="dynamic")
-
-        # Save changes to the CSV when the admin clicks 'Save changes'
-        if st.button('Save changes'):
-            # Validate if Role is in the correct format (optional)
-            valid_roles = ['admin', 'tester', 'viewer', 'guest']
-            if all(role in valid_roles for role in edited_data['Role']):
-                edited_data.to_csv(CSV_FILE, index=False)
-                st.success('User data updated successfully!')
-            else:
-                st.error('Invalid role found! Roles must be one of the following: admin, tester, viewer')
-    else:
-        st.error("No user data found. Please ensure the user_data.csv file exists.")
+    store = get_user_store()
+    total_users = store.count_users()
+    if not total_users:
+        st.error("No users in the user database.")
+        return
+
+    if st.session_state.pop('user_editor_saved', False):
+        st.success('User data updated successfully!')
+    st.write("Edit user roles in the table below and click 'Save changes'.")
+
+    page_count = max(1, math.ceil(total_users / PAGE_SIZE))
+    page = st.number_input(f'Page (of {page_count}, {total_users} users)', min_value=1, max_value=page_count, value=1)
+    data = store.load_page((page - 1) * PAGE_SIZE, PAGE_SIZE)
+
+    # A new key after every save starts the editor from the freshly saved rows
+    editor_version = st.session_state.setdefault('user_editor_version', 0)
+    editor_key = f'user_editor_{page}_{editor_version}'
+    st.data_editor(data, use_container_width=True, num_rows="dynamic", hide_index=True, key=editor_key)
 
+    # Only the rows touched in the editor are written, in one transaction
+    if st.button('Save changes'):
+        changes = st.session_state[editor_key]
+        if invalid_roles(changes):
+            st.error('Invalid role found! Roles must be one of the following: admin, tester, viewer')
+        else:
+            store.apply_changes(data.index.tolist(), changes['edited_rows'], changes['added_rows'], changes['deleted_rows'])
+            st.session_state['user_editor_version'] = editor_version + 1
+            st.session_state['user_editor_saved'] = True
+            st.rerun()
@@ -22,5 +22,5 @@ if st_selectFile:
     selectedFile = [(fileID, modifiedTime) for name, fileID, modifiedTime in listFiles if name == st_selectFile][0] # Storing only id and modified time (name is neglected)
     selectedFile_ID = selectedFile[0]
     lastUpdated_time = selectedFile[1]
-    fileData = driveAPI.read_file_from_drive(selectedFile_ID)
+    fileData = driveAPI.read_file_from_drive(selectedFile_ID, lastUpdated_time)
 
@@ -0,0 +1,115 @@
+'''
+Benchmark: downloading several workbooks one after another vs driveClient.download_many, and the
+public bulk entry point googleConnect.read_files_from_drive
+
+Runs against benchmarks/fake_drive.py with a fixed latency per HTTP request, so the numbers
+show how much of the per-request wait is overlapped (no network or credentials needed).
+read_files_from_drive goes through an empty on-disk cache in a temporary directory (cold), then
+with half of the files cached, then again cold while a page reads one of the files at the same time;
+the media requests column shows each version is downloaded once.
+
+Run from the repository root:
+    python -m benchmarks.bench_bulk_download
+    python -m benchmarks.bench_bulk_download --files 16 --size-kb 4096 --latency 0.1 --workers 1,4,8
+'''
+import argparse
+import logging
+import os
+import tempfile
+import threading
+import time
+
+from google.auth.credentials import AnonymousCredentials
+
+from benchmarks.fake_drive import MODIFIED_TIME, fakeDrive
+from Components.gdrive_database import gdrive_conn
+from Components.gdrive_database.drive_cache import driveFileCache
+from Components.gdrive_database.drive_client import driveClient
+
+FOLDER_ID = 'bench-folder'
+
+
+def media_requests(client):
+    return client.metrics().get('drive.files.get_media', {}).get('requests', 0)
+
+
+def bulk_read(connect, files, workers, expected):
+    '''
+    (total seconds, seconds to the first file, media requests) of one read_files_from_drive
+    '''
+    requests = media_requests(connect.client)
+    start = time.perf_counter()
+    first = None
+    for file_id, file_data in connect.read_files_from_drive([(file_id, MODIFIED_TIME) for file_id in files], workers):
+        first = first or time.perf_counter() - start
+        assert file_data.getvalue() == expected[file_id]
+    return time.perf_counter() - start, first, media_requests(connect.client) - requests
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--files', type=int, default=12)
+    parser.add_argument('--size-kb', type=int, default=1024)
+    parser.add_argument('--latency', type=float, default=0.05, help='seconds added to every HTTP request')
+    parser.add_argument('--workers', default='2,4,8')
+    parser.add_argument('--fail-every', type=int, default=0, help='answer every Nth request with 503')
+    args = parser.parse_args()
+    # st.cache_resource outside `streamlit run` only logs noise
+    logging.disable(logging.WARNING)
+
+    files = {f'file-{i}': os.urandom(args.size_kb * 1024) for i in range(args.files)}
+    with fakeDrive(files, latency=args.latency, fail_every=args.fail_every) as drive:
+        workers_list = [int(w) for w in args.workers.split(',')]
+        client = driveClient(AnonymousCredentials(), api_endpoint=drive.endpoint, download_workers=max(workers_list))
+
+        start = time.perf_counter()
+        for file_id in files:
+            assert client.download(file_id).getvalue() == files[file_id]
+        sequential = time.perf_counter() - start
+
+        print(f"{args.files} files x {args.size_kb} KB, {args.latency * 1000:.0f} ms per request")
+        print(f"{'mode':<34} {'total (s)':>10} {'first file (s)':>15} {'speedup':>8} {'media requests':>15}")
+        print(f"{'sequential':<34} {sequential:>10.3f} {sequential / args.files:>15.3f} {1:>8.1f} {args.files:>15}")
+        for workers in workers_list:
+            requests = media_requests(client)
+            start = time.perf_counter()
+            first = None
+            for file_id, file_data in client.download_many(files, max_workers=workers):
+                first = first or time.perf_counter() - start
+                assert file_data.getvalue() == files[file_id]
+            total = time.perf_counter() - start
+            label = f'download_many, {workers} workers'
+            print(f"{label:<34} {total:>10.3f} {first:>15.3f} {sequential / total:>8.1f} {media_requests(client) - requests:>15}")
+
+        # The Drive client the app would build from the service account, replaced like benchmarks/load_test_app.py does
+        gdrive_conn.get_drive_client = lambda service_account_file, scopes: client
+        connect = gdrive_conn.googleConnect(None, None, FOLDER_ID)
+        workers = max(workers_list)
+        with tempfile.TemporaryDirectory() as cache_dir:
+            rows = []
+            connect.file_cache = driveFileCache(cache_dir)
+            rows.append(('read_files_from_drive, cold', bulk_read(connect, files, workers, files)))
+
+            for i, file_id in enumerate(files):
+                if i % 2:
+                    connect.forget_file(file_id)
+            rows.append(('read_files_from_drive, half cached', bulk_read(connect, files, workers, files)))
+
+            for file_id in files:
+                connect.forget_file(file_id)
+            page_file = next(iter(files))
+            page = threading.Thread(target=lambda: connect.read_file_from_drive(page_file, MODIFIED_TIME))
+            page.start()
+            rows.append(('read_files_from_drive + page read', bulk_read(connect, files, workers, files)))
+            page.join()
+
+            for label, (total, first, requests) in rows:
+                print(f"{label:<34} {total:>10.3f} {first:>15.3f} {sequential / total:>8.1f} {requests:>15}")
+
+        metrics = client.metrics()['total']
+        print(f"requests={metrics['requests']} retries={metrics['retries']} avg latency={metrics['latency_avg'] * 1000:.1f} ms")
+        client.close()
+
+
+if __name__ == '__main__':
+    main()
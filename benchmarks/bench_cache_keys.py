@@ -0,0 +1,93 @@
+'''
+Benchmark: cost of one cache hit, keyed on the data itself vs keyed on a fingerprint
+
+Before, the PTR page cached processing_excel(file_data, sheet_name) and progress_status(df, version)
+with st.cache_data, so every hit hashed the whole BytesIO / DataFrame to build the key (and unpickled
+a copy of the result). Now the cached functions take (file id, modifiedTime, sheet[, version]) and
+resolve the heavy objects behind that key in the memory cache (Components.memory_cache).
+
+For the bundled workbooks and synthetic ones scaled up (benchmarks.synthetic_workbook), the median
+time of one hit of:
+    buffer key        st.cache_data on (BytesIO, sheet name), like the old processing_excel
+    frame key         st.cache_data on (DataFrame, version), like the old progress_status
+    fingerprint key   memoryCache.get_or_load on ('sheet', file id, modifiedTime, sheet name)
+
+Run from the repository root:
+    python -m benchmarks.bench_cache_keys
+    python -m benchmarks.bench_cache_keys --scales 10,100 --repeat 20
+'''
+import argparse
+import logging
+import os
+import statistics
+import time
+from io import BytesIO
+
+import streamlit as st
+
+from benchmarks.bench_pipeline import DATASETS, largest_ptr_sheet
+from benchmarks.synthetic_workbook import synthetic_workbook
+from Components.memory_cache import memoryCache
+from ptr.status_matrix import build_status_matrix, version_status
+from ptr.workbook import ptrWorkbook
+
+SCALES = '10,100'
+MODIFIED_TIME = '2024-11-15T00:00:00.000Z'
+
+
+@st.cache_data
+def processing_excel_by_buffer(file_data, sheet_name):
+    return ptrWorkbook(file_data).ptr_sheet(sheet_name)
+
+
+@st.cache_data
+def progress_status_by_frame(excel_ptr, versions, version):
+    return version_status(build_status_matrix(excel_ptr, versions), version)
+
+
+def hit_time(func, repeat):
+    '''
+    Median seconds of one call of func, after a first call that fills the cache
+    '''
+    func()
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - start)
+    return statistics.median(times)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('datasets', nargs='*', default=DATASETS)
+    parser.add_argument('--scales', default=SCALES, help="comma separated synthetic scales, '' for none")
+    parser.add_argument('--repeat', type=int, default=10)
+    args = parser.parse_args()
+    # st.cache_data outside `streamlit run` only logs noise
+    logging.disable(logging.WARNING)
+
+    paths = list(args.datasets) + [synthetic_workbook(int(scale)) for scale in args.scales.split(',') if scale]
+    memory = memoryCache()
+
+    print(f"{'workbook':<28} {'rows':>8} {'buffer key (ms)':>16} {'frame key (ms)':>15} {'fingerprint key (us)':>21}")
+    for path in paths:
+        with open(path, 'rb') as f:
+            file_bytes = f.read()
+        found = largest_ptr_sheet(ptrWorkbook(BytesIO(file_bytes)))
+        if found is None:
+            continue
+        sheet_name, excel_ptr, versions = found
+        file_id = os.path.basename(path)
+
+        buffer_key = hit_time(lambda: processing_excel_by_buffer(BytesIO(file_bytes), sheet_name), args.repeat)
+        frame_key = hit_time(lambda: progress_status_by_frame(excel_ptr, versions, versions[-1]), args.repeat)
+        fingerprint_key = hit_time(
+            lambda: memory.get_or_load(('sheet', file_id, MODIFIED_TIME, sheet_name), lambda: (excel_ptr, versions)),
+            args.repeat
+        )
+        print(f"{file_id:<28} {len(excel_ptr):>8} {buffer_key * 1e3:>16.2f} {frame_key * 1e3:>15.2f} {fingerprint_key * 1e6:>21.2f}")
+
+
+if __name__ == '__main__':
+    main()
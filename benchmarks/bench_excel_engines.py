@@ -0,0 +1,64 @@
+'''
+Benchmark: Excel reader engines behind ptr.workbook.ptrWorkbook
+
+For every engine: open the workbook, parse every sheet (header=None) and clean the PTR sheets.
+pandas' openpyxl engine already opens workbooks with read_only=True, so "openpyxl" here is the
+read-only streaming reader; "calamine" needs python-calamine.
+
+Run from the repository root:
+    python -m benchmarks.bench_excel_engines
+'''
+import argparse
+import importlib.util
+import logging
+import time
+from io import BytesIO
+
+from ptr.workbook import default_engine, ptrWorkbook
+
+DATASETS = ['dataset/PTR_Rilis_D.xlsx', 'dataset/PTR_Nov_2024.xlsx']
+ENGINES = {'openpyxl': 'openpyxl', 'calamine': 'python_calamine'}
+
+
+def load_all_sheets(file_bytes, engine):
+    workbook = ptrWorkbook(BytesIO(file_bytes), engine=engine)
+    sheets = {}
+    for sheet_name in workbook.sheet_names:
+        try:
+            sheets[sheet_name] = workbook.ptr_sheet(sheet_name)[0]
+        except Exception:
+            sheets[sheet_name] = workbook.raw_sheet(sheet_name)
+    return sheets
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('datasets', nargs='*', default=DATASETS)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+    logging.disable(logging.WARNING)
+
+    engines = [engine for engine, module in ENGINES.items() if importlib.util.find_spec(module) is not None]
+    print(f"auto-selected engine: {default_engine()}")
+    print(f"{'workbook':<28} {'engine':>10} {'best (s)':>10} {'vs openpyxl':>12}  same frames")
+    for path in args.datasets:
+        with open(path, 'rb') as f:
+            file_bytes = f.read()
+
+        results = {}
+        for engine in engines:
+            best = float('inf')
+            for _ in range(args.repeat):
+                start = time.perf_counter()
+                sheets = load_all_sheets(file_bytes, engine)
+                best = min(best, time.perf_counter() - start)
+            results[engine] = (best, sheets)
+
+        baseline_time, baseline = results['openpyxl']
+        for engine, (best, sheets) in results.items():
+            same = sheets.keys() == baseline.keys() and all(sheets[name].equals(baseline[name]) for name in sheets)
+            print(f"{path.split('/')[-1]:<28} {engine:>10} {best:>10.3f} {baseline_time / best:>11.1f}x  {same}")
+
+
+if __name__ == '__main__':
+    main()
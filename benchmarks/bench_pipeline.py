@@ -0,0 +1,186 @@
+'''
+Benchmark: every stage of the PTR page pipeline, on the bundled workbooks and on synthetic
+workbooks scaled up 10x / 100x / 1000x (benchmarks.synthetic_workbook)
+
+Stages, for the largest PTR sheet of each workbook:
+    processing_excel   open the workbook from its bytes and clean the sheet (ptrWorkbook.ptr_sheet)
+    status_matrix      status percentages of every version x OS (build_status_matrix)
+    progress_status    one version in the progress chart layout (version_status)
+    sankey_flows       nodes / links of the Sankey for the latest version (build_sankey_flows)
+    summary_parse      '-' sheet to the three heatmap grids (parse_summary_sheet + summary_heatmap)
+    sankey_figure, progress_figure, heatmap_figure   building the Plotly figures (ptr.charts)
+    figures_to_json    serializing the three figures like st.plotly_chart does
+
+The bundled workbooks predate the 'Status <PTR Ver ...>' columns and have no '-' sheet: their
+versions are taken from the 'Status ...' column names and the summary stages are skipped, as are
+the Sankey stages for a sheet without the columns the Sankey is drawn from.
+
+Every measurement is appended as one JSON object per line to --output, so runs can be compared
+over time, e.g. with pandas.read_json(path, lines=True).
+
+Run from the repository root:
+    python -m benchmarks.bench_pipeline
+    python -m benchmarks.bench_pipeline --scales 10,100 --repeat 5 --output /tmp/pipeline.jsonl
+'''
+import argparse
+import json
+import logging
+import os
+import platform
+import statistics
+import subprocess
+import time
+from datetime import datetime, timezone
+from io import BytesIO
+
+from benchmarks.synthetic_workbook import synthetic_workbook
+from ptr.charts import heatmap_plot, progress_plot, sankey_plot
+from ptr.sankey_flow import build_sankey_flows
+from ptr.status_matrix import MISSING_STATUS, STATUS_PREFIX, build_status_matrix, status_columns, version_status
+from ptr.summary_sheet import SUMMARY_PLATFORMS, parse_summary_sheet, summary_heatmap
+from ptr.workbook import SUMMARY_SHEET, ptrWorkbook
+
+DATASETS = ['dataset/PTR_Nov_2024.xlsx', 'dataset/PTR_Rilis_D.xlsx']
+SCALES = '10,100,1000'
+OUTPUT = os.path.join('benchmarks', 'results', 'pipeline.jsonl')
+
+# Columns build_sankey_flows reads besides the primary and status columns
+SANKEY_COLUMNS = {'Sub-features', 'OS', 'OS Version', 'Tipe Device HP'}
+
+
+def git_commit():
+    result = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True)
+    return result.stdout.strip() or None
+
+
+def largest_ptr_sheet(workbook):
+    '''
+    (sheet name, excel_ptr, versions) of the PTR sheet with the most rows that has status columns
+    '''
+    best = None
+    for sheet_name in workbook.sheet_names:
+        if sheet_name == SUMMARY_SHEET:
+            continue
+        try:
+            excel_ptr, versions = workbook.ptr_sheet(sheet_name)
+        except Exception:
+            continue
+        versions = list(status_columns(excel_ptr, versions)) or [
+            column[len(STATUS_PREFIX):] for column in excel_ptr.columns
+            if isinstance(column, str) and column.startswith(STATUS_PREFIX)
+        ]
+        if versions and (best is None or len(excel_ptr) > len(best[1])):
+            best = (sheet_name, excel_ptr, versions)
+    return best
+
+
+def timed(func, repeat):
+    '''
+    (seconds of every run, result of the last run)
+    '''
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        times.append(time.perf_counter() - start)
+    return times, result
+
+
+def pipeline_stages(file_bytes, repeat):
+    '''
+    Yield (stage, sheet name, rows, run times) for one workbook
+    '''
+    import plotly.io as pio
+
+    workbook = ptrWorkbook(BytesIO(file_bytes))
+    found = largest_ptr_sheet(workbook)
+    if found is None:
+        return
+    sheet_name, excel_ptr, versions = found
+    rows = len(excel_ptr)
+    version = versions[-1]
+    status_column = STATUS_PREFIX + version
+
+    times, _ = timed(lambda: ptrWorkbook(BytesIO(file_bytes)).ptr_sheet(sheet_name), repeat)
+    yield 'processing_excel', sheet_name, rows, times
+
+    times, matrix = timed(lambda: build_status_matrix(excel_ptr, versions), repeat)
+    yield 'status_matrix', sheet_name, rows, times
+    times, df_plot = timed(lambda: version_status(matrix, version), repeat)
+    yield 'progress_status', sheet_name, rows, times
+
+    figures = []
+    if SANKEY_COLUMNS <= set(excel_ptr.columns):
+        # The page shows empty status cells as 'N/A' before drawing the Sankey
+        sankey_frame = excel_ptr.copy()
+        sankey_frame[status_column] = sankey_frame[status_column].fillna(MISSING_STATUS)
+        primary_column = 'Link JIRA' if 'Link JIRA' in sankey_frame.columns else 'Features'
+        times, _ = timed(lambda: build_sankey_flows(sankey_frame, status_column, primary_column), repeat)
+        yield 'sankey_flows', sheet_name, rows, times
+        times, figure = timed(lambda: sankey_plot(sankey_frame, status_column, primary_column), repeat)
+        figures.append(figure)
+        yield 'sankey_figure', sheet_name, rows, times
+
+    times, figure = timed(lambda: progress_plot(df_plot), repeat)
+    figures.append(figure)
+    yield 'progress_figure', sheet_name, rows, times
+
+    if SUMMARY_SHEET in workbook.sheet_names:
+        raw_summary = workbook.summary_sheet()
+        times, summary = timed(
+            lambda: [summary_heatmap(parse_summary_sheet(raw_summary), name) for name in SUMMARY_PLATFORMS],
+            repeat
+        )
+        yield 'summary_parse', SUMMARY_SHEET, len(raw_summary), times
+        summary = parse_summary_sheet(raw_summary)
+        times, figure = timed(lambda: heatmap_plot(summary), repeat)
+        figures.append(figure)
+        yield 'heatmap_figure', SUMMARY_SHEET, len(raw_summary), times
+
+    times, _ = timed(lambda: [pio.to_json(figure, validate=False) for figure in figures], repeat)
+    yield 'figures_to_json', sheet_name, rows, times
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('datasets', nargs='*', default=DATASETS)
+    parser.add_argument('--scales', default=SCALES, help="comma separated synthetic scales, '' for none")
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--output', default=OUTPUT, help="JSON lines file the results are appended to, '-' for stdout")
+    args = parser.parse_args()
+    logging.disable(logging.WARNING)
+
+    workbooks = [(path, None) for path in args.datasets]
+    workbooks += [(synthetic_workbook(int(scale)), int(scale)) for scale in args.scales.split(',') if scale]
+
+    run = {
+        'run': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'commit': git_commit(),
+        'python': platform.python_version(),
+    }
+    records = []
+    print(f"{'workbook':<28} {'sheet':<24} {'stage':<17} {'rows':>8} {'median (s)':>11} {'best (s)':>10}")
+    for path, scale in workbooks:
+        with open(path, 'rb') as f:
+            file_bytes = f.read()
+        for stage, sheet_name, rows, times in pipeline_stages(file_bytes, args.repeat):
+            record = dict(
+                run, workbook=os.path.basename(path), scale=scale, sheet=sheet_name, stage=stage, rows=rows,
+                repeat=len(times), median_s=statistics.median(times), best_s=min(times),
+            )
+            records.append(record)
+            print(f"{record['workbook']:<28} {sheet_name[:24]:<24} {stage:<17} {rows:>8} "
+                  f"{record['median_s']:>11.4f} {record['best_s']:>10.4f}")
+
+    lines = ''.join(json.dumps(record) + '\n' for record in records)
+    if args.output == '-':
+        print(lines, end='')
+    else:
+        os.makedirs(os.path.dirname(args.output) or '.', exist_ok=True)
+        with open(args.output, 'a') as f:
+            f.write(lines)
+        print(f'\n{len(records)} results appended to {args.output}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,187 @@
+'''
+Benchmark: Sankey flow construction, old per-row iterrows loop vs ptr.sankey_flow.build_sankey_flows,
+plus the size of the go.Sankey payload with per-row, weighted and level-of-detail links
+
+Run from the repository root:
+    python -m benchmarks.bench_sankey
+'''
+import argparse
+import json
+import time
+from collections import Counter
+
+import pandas as pd
+import plotly.graph_objects as go
+from plotly.colors import qualitative
+
+from ptr.sankey_flow import DEFAULT_NODE_BUDGET, build_sankey_flows, hex_to_rgba, wrap_long_name
+
+DATASET = 'dataset/PTR_Nov_2024.xlsx'
+SHEET = 'Regresi PTR Tester'
+
+
+def load_sheet(path, sheet_name):
+    '''
+    Minimal version of processing_excel: header row, column rename and ffill
+    '''
+    raw = pd.read_excel(path, sheet_name, header=None)
+    header_index = raw.head(20).apply(lambda row: row.astype(str).str.contains('Features').any(), axis=1).idxmax()
+    df = raw.iloc[header_index + 1:, 1:].copy()
+    df.columns = raw.iloc[header_index].values[1:]
+    df.reset_index(drop=True, inplace=True)
+    df['OS Version'] = df['OS Version'].astype(str)
+    df.rename(columns={'Sub Fitur': 'Sub-features'}, inplace=True)
+    df[['Features', 'Sub-features', 'Expected Condition']] = df[['Features', 'Sub-features', 'Expected Condition']].ffill()
+    return df
+
+
+def legacy_sankey_flows(excel_ptr, status_column, primary_column):
+    '''
+    The loop that used to live in display_tester_page, kept here as the baseline
+    '''
+    nodes = list(set(
+        excel_ptr[primary_column].tolist() +
+        excel_ptr['Sub-features'].tolist() +
+        excel_ptr['OS'].tolist() +
+        excel_ptr['OS Version'].tolist() +
+        excel_ptr['Tipe Device HP'].tolist() +
+        excel_ptr[status_column].tolist()
+    ))
+    short_nodes = [(str(node)[:30] + "...") if isinstance(node, str) and len(str(node)) > 30 else str(node) for node in nodes]
+    long_nodes = [wrap_long_name(node) for node in nodes]
+
+    sources, targets = [], []
+    for _, row in excel_ptr.iterrows():
+        primary_value = row[primary_column]
+        sub_feature = row["Sub-features"]
+        status = row[status_column]
+        os_type = row["OS"]
+
+        if status == "Passed":
+            sources.append(nodes.index(primary_value))
+            targets.append(nodes.index(status))
+            sources.append(nodes.index(status))
+            targets.append(nodes.index(os_type))
+        elif status == "Failed" or status == "N/A" or status == "In Progress" or status == "Not Started":
+            sources.append(nodes.index(primary_value))
+            targets.append(nodes.index(sub_feature))
+            sources.append(nodes.index(sub_feature))
+            targets.append(nodes.index(status))
+            sources.append(nodes.index(status))
+            targets.append(nodes.index(os_type))
+
+        incoming_flows = {node: 0 for node in nodes}
+        outgoing_flows = {node: 0 for node in nodes}
+        for source, target in zip(sources, targets):
+            outgoing_flows[nodes[source]] += 1
+            incoming_flows[nodes[target]] += 1
+
+        customdata = [
+            f"{long_name} <br>Incoming: {incoming_flows[node]} <br>Outgoing: {outgoing_flows[node]}"
+            for node, long_name in zip(nodes, long_nodes)
+        ]
+        values = [1] * len(sources)
+
+        color_palette = qualitative.Light24
+        node_colors = {}
+        for i, primary_value in enumerate(excel_ptr[primary_column].unique()):
+            node_colors[primary_value] = hex_to_rgba(color_palette[i % len(color_palette)], alpha=1)
+        for primary_value in excel_ptr[primary_column].unique():
+            for sub_feature in excel_ptr[excel_ptr[primary_column] == primary_value]["Sub-features"].unique():
+                node_colors[sub_feature] = "rgba(200, 200, 200, 0.8)"
+        node_colors["Passed"] = "rgba(144, 238, 144, 0.8)"
+        node_colors["Failed"] = "rgba(205, 92, 92, 0.8)"
+        node_colors["Android"] = "#71BC68"
+        node_colors["iOS"] = "rgba(70, 130, 180, 0.8)"
+        node_color_list = [node_colors.get(node, "rgba(200, 200, 200, 0.8)") for node in nodes]
+
+        link_colors = []
+        for source, target in zip(sources, targets):
+            rgba_values = node_colors.get(nodes[source], "rgba(192, 192, 192, 0.3)").strip("rgba()").split(",")
+            if len(rgba_values) == 4:
+                r, g, b, _ = map(float, rgba_values[:4])
+                link_colors.append(f"rgba({int(r)}, {int(g)}, {int(b)}, 0.3)")
+            else:
+                link_colors.append("rgba(192, 192, 192, 0.3)")
+
+    return {
+        'labels': short_nodes,
+        'customdata': customdata,
+        'node_colors': node_color_list,
+        'sources': sources,
+        'targets': targets,
+        'values': values,
+        'link_colors': link_colors,
+    }
+
+
+def flows_signature(flows):
+    '''
+    Order independent view of a flow dict: total weight per (source node, target node, link color)
+    '''
+    nodes = list(zip(flows['labels'], flows['customdata'], flows['node_colors']))
+    links = Counter()
+    for s, t, v, c in zip(flows['sources'], flows['targets'], flows['values'], flows['link_colors']):
+        links[(nodes[s], nodes[t], c)] += v
+    return links
+
+
+def payload_size(flows):
+    '''
+    Number of nodes, links and bytes of figure JSON sent to the browser
+    '''
+    fig = go.Figure(data=[go.Sankey(
+        node=dict(label=flows['labels'], color=flows['node_colors'], customdata=flows['customdata']),
+        link=dict(source=flows['sources'], target=flows['targets'], value=flows['values'], color=flows['link_colors'])
+    )])
+    return len(flows['labels']), len(flows['sources']), len(json.dumps(fig.to_plotly_json(), default=str))
+
+
+def timed(func, *args, repeat=3):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func(*args)
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--dataset', default=DATASET)
+    parser.add_argument('--sheet', default=SHEET)
+    parser.add_argument('--scales', default='1,2,5', help='comma separated row multipliers')
+    args = parser.parse_args()
+
+    base = load_sheet(args.dataset, args.sheet)
+    status_column = next(column for column in base.columns if str(column).startswith('Status'))
+    primary_column = "Link JIRA" if "Link JIRA" in base.columns else "Features"
+    base[status_column] = base[status_column].fillna('N/A')
+
+    print(f"{args.dataset} [{args.sheet}] status column: {status_column!r}")
+    print(f"{'rows':>8} {'legacy (s)':>12} {'vectorized (s)':>15} {'speedup':>9}  same output")
+    for scale in [int(s) for s in args.scales.split(',')]:
+        df = pd.concat([base] * scale, ignore_index=True)
+        legacy_time, legacy = timed(legacy_sankey_flows, df, status_column, primary_column, repeat=1)
+        new_time, new = timed(build_sankey_flows, df, status_column, primary_column)
+        same = flows_signature(legacy) == flows_signature(new)
+        print(f"{len(df):>8} {legacy_time:>12.4f} {new_time:>15.4f} {legacy_time / new_time:>8.1f}x  {same}")
+
+    print()
+    print(f"Sankey payload (node budget {DEFAULT_NODE_BUDGET} for level of detail)")
+    print(f"{'rows':>8} {'mode':>10} {'nodes':>7} {'links':>7} {'json bytes':>11}")
+    for scale in [1, 10, 100]:
+        df = pd.concat([base] * scale, ignore_index=True)
+        # make every copy of the sheet its own set of features, like a bigger release would
+        df['Sub-features'] = df['Sub-features'].astype(str) + ' #' + (df.index // len(base)).astype(str)
+        for mode, kwargs in [
+            ('per-row', dict(aggregate=False)),
+            ('weighted', dict(aggregate=True)),
+            ('lod', dict(aggregate=True, node_budget=DEFAULT_NODE_BUDGET)),
+        ]:
+            nodes, links, size = payload_size(build_sankey_flows(df, status_column, primary_column, **kwargs))
+            print(f"{len(df):>8} {mode:>10} {nodes:>7} {links:>7} {size:>11}")
+
+
+if __name__ == '__main__':
+    main()
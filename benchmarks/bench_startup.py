@@ -0,0 +1,84 @@
+'''
+Benchmark: cold import time of the Streamlit entry points, from python -X importtime
+
+Every entry module is imported in a fresh interpreter (--repeat times, the median run is kept),
+then the modules it imports directly are listed by cumulative import time, so a heavy eager
+import shows up next to the page that pays for it.
+
+Run from the repository root:
+    python -m benchmarks.bench_startup
+    python -m benchmarks.bench_startup ptr.sankey_flow --top 15
+'''
+import argparse
+import re
+import statistics
+import subprocess
+import sys
+
+ENTRY_MODULES = [
+    'Components.login_page',
+    'guest.guest_page',
+    'admin.admin_page',
+    'ptr.ptr_page',
+    'jira.jira_page',
+]
+
+IMPORT_LINE = re.compile(r'^import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)$')
+
+
+def import_profile(module):
+    '''
+    (cumulative us of module, [(cumulative us, name) of the modules it imports directly]) for one
+    cold import, or the error text
+    '''
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+        capture_output=True, text=True
+    )
+    if result.returncode != 0:
+        return result.stderr.strip().splitlines()[-1]
+
+    lines = []
+    for line in result.stderr.splitlines():
+        match = IMPORT_LINE.match(line)
+        if match:
+            _, cumulative_us, indent, name = match.groups()
+            lines.append((name, int(cumulative_us), (len(indent) - 1) // 2))
+
+    # Children are printed before their parent: walk back from the module to the previous top level import
+    position = max(i for i, (name, _, depth) in enumerate(lines) if name == module and depth == 0)
+    direct = []
+    for name, cumulative_us, depth in reversed(lines[:position]):
+        if depth == 0:
+            break
+        if depth == 1:
+            direct.append((cumulative_us, name))
+    return lines[position][1], direct
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('modules', nargs='*', default=ENTRY_MODULES)
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--top', type=int, default=8, help='direct imports listed per entry module')
+    args = parser.parse_args()
+
+    for module in args.modules:
+        runs = [import_profile(module) for _ in range(args.repeat)]
+        failed = [run for run in runs if isinstance(run, str)]
+        if failed:
+            print(f'{module:<40} not importable here: {failed[0]}\n')
+            continue
+
+        runs.sort()
+        _, direct = runs[len(runs) // 2]
+        totals = [total / 1000 for total, _ in runs]
+        print(f'{module:<40} {statistics.median(totals):>9.1f} ms  (min {min(totals):.1f}, max {max(totals):.1f})')
+
+        for cumulative, name in sorted(direct, reverse=True)[:args.top]:
+            print(f'    {name:<48} {cumulative / 1000:>9.1f} ms')
+        print()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,84 @@
+'''
+Benchmark: Excel parse time per PTR page view, before and after ptr.workbook.ptrWorkbook
+
+Old page view : pd.ExcelFile(...) for the sheet list, pd.read_excel again for the selected sheet,
+                then the file is read again for the '-' summary sheet.
+New page view : one ptrWorkbook, sheets parsed once; a second view (same or another sheet) reuses it.
+
+Run from the repository root:
+    python -m benchmarks.bench_workbook
+'''
+import argparse
+import logging
+import time
+from io import BytesIO
+
+import pandas as pd
+
+from ptr.workbook import SUMMARY_SHEET, clean_ptr_sheet, ptrWorkbook
+
+DATASETS = ['dataset/PTR_Nov_2024.xlsx', 'dataset/PTR_Rilis_D.xlsx']
+
+
+def old_page_view(file_bytes, sheet_name, summary_sheet):
+    sheet_names = pd.ExcelFile(BytesIO(file_bytes)).sheet_names
+    excel_ptr, listof_ver = clean_ptr_sheet(pd.read_excel(BytesIO(file_bytes), sheet_name, header=None))
+    df_heat = pd.read_excel(BytesIO(file_bytes), summary_sheet, header=None)
+    return sheet_names, excel_ptr, df_heat
+
+
+def new_page_view(workbook, sheet_name, summary_sheet):
+    excel_ptr, listof_ver = workbook.ptr_sheet(sheet_name)
+    df_heat = workbook.raw_sheet(summary_sheet)
+    return workbook.sheet_names, excel_ptr, df_heat
+
+
+def first_ptr_sheet(file_bytes):
+    workbook = ptrWorkbook(BytesIO(file_bytes))
+    for sheet_name in workbook.sheet_names:
+        try:
+            excel_ptr, _ = workbook.ptr_sheet(sheet_name)
+            if 'Sub-features' in excel_ptr.columns:
+                return sheet_name
+        except Exception:
+            continue
+    return workbook.sheet_names[0]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('datasets', nargs='*', default=DATASETS)
+    parser.add_argument('--views', type=int, default=3, help='page views (reruns) on the same sheet')
+    args = parser.parse_args()
+    # clean_ptr_sheet may call st.warning, which only logs noise outside `streamlit run`
+    logging.disable(logging.WARNING)
+
+    print(f"{'workbook':<28} {'old / view (s)':>15} {'new 1st view (s)':>17} {'new next (s)':>13} {'saved / view (s)':>17}")
+    for path in args.datasets:
+        with open(path, 'rb') as f:
+            file_bytes = f.read()
+        sheet_name = first_ptr_sheet(file_bytes)
+        sheet_names = pd.ExcelFile(BytesIO(file_bytes)).sheet_names
+        # The bundled workbooks have no '-' sheet, their last sheet stands in for it
+        summary_sheet = SUMMARY_SHEET if SUMMARY_SHEET in sheet_names else sheet_names[-1]
+
+        start = time.perf_counter()
+        for _ in range(args.views):
+            old_page_view(file_bytes, sheet_name, summary_sheet)
+        old_time = (time.perf_counter() - start) / args.views
+
+        start = time.perf_counter()
+        workbook = ptrWorkbook(BytesIO(file_bytes))
+        new_page_view(workbook, sheet_name, summary_sheet)
+        first_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        for _ in range(args.views - 1):
+            new_page_view(workbook, sheet_name, summary_sheet)
+        next_time = (time.perf_counter() - start) / max(args.views - 1, 1)
+
+        print(f"{path.split('/')[-1]:<28} {old_time:>15.3f} {first_time:>17.3f} {next_time:>13.5f} {old_time - first_time:>17.3f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,178 @@
+'''
+Regression check: the optimized PTR pipeline against the code the page used to run
+
+    processing_excel   ptrWorkbook.ptr_sheet (both Excel engines) against the old processing_excel
+                       (pd.read_excel + full-frame cleaning), on every sheet of the bundled workbooks
+    progress_status    version_status(build_status_matrix(...)) against the old progress_status
+                       (value_counts per platform), for every version of a synthetic workbook
+
+Frames are compared with pandas.testing.assert_frame_equal (values, dtypes, column names and
+order); the version lists must be equal too. Sheets the old code could not process must fail in
+the new code as well. Exits with status 1 on the first difference, so it can gate a refactor.
+
+Run from the repository root:
+    python -m benchmarks.check_equivalence
+    python -m benchmarks.check_equivalence dataset/PTR_Nov_2024.xlsx --scale 10
+'''
+import argparse
+import glob
+import logging
+import os
+import sys
+from io import BytesIO
+
+import pandas as pd
+from pandas.testing import assert_frame_equal
+
+from benchmarks.synthetic_workbook import synthetic_workbook
+from ptr.status_matrix import MISSING_STATUS, build_status_matrix, version_status
+from ptr.workbook import FALLBACK_ENGINE, FAST_ENGINE, SUMMARY_SHEET, ptrWorkbook
+
+DATASET_GLOB = os.path.join('dataset', '*.xlsx')
+SCALE = 1
+
+
+def old_processing_excel(file_data, sheet_name):
+    '''
+    processing_excel as the page had it before ptr.workbook (st.warning left out)
+    '''
+    excel_ptr = pd.read_excel(file_data, sheet_name, header=None)
+    temp_df = excel_ptr.ffill()
+
+    listof_ver = temp_df[temp_df[1].str.contains('PTR Ver', na=False)][1].unique().tolist()
+
+    value_to_skip = 'Features'
+    max_rows_to_scan = 20
+
+    header_index = excel_ptr.head(max_rows_to_scan).apply(lambda row: row.astype(str).str.contains(value_to_skip).any(), axis=1).idxmax()
+
+    if not pd.isna(header_index):
+        new_header = excel_ptr.iloc[header_index].values
+        excel_ptr = excel_ptr.iloc[header_index+1:].copy()
+        excel_ptr.columns = new_header
+
+    excel_ptr = excel_ptr.iloc[:, 1:]
+    excel_ptr.reset_index(drop=True, inplace=True)
+
+    if 'OS Version' in excel_ptr.columns:
+        excel_ptr['OS Version'] = excel_ptr['OS Version'].astype(str)
+
+    excel_ptr.drop(columns='No', inplace=True, errors='ignore')
+
+    excel_ptr.rename(columns={
+        'Sub Fitur': 'Sub-features',
+        'Rekening Sumber\n[Jika ada]': 'Rekening Sumber',
+        'Data yang Digunakan\n[Jika ada]': 'Data yang digunakan',
+        'FT\n[Jika Ada]': 'FT',
+    }, inplace=True)
+
+    columns_to_ffill = ['Features', 'Sub-features', 'Expected Condition']
+    if 'Link JIRA' in excel_ptr.columns:
+        columns_to_ffill.append('Link JIRA')
+    excel_ptr[columns_to_ffill] = excel_ptr[columns_to_ffill].apply(lambda x: x.ffill())
+
+    return excel_ptr, listof_ver
+
+
+def old_progress_status(df, version):
+    '''
+    progress_status as the page had it before ptr.status_matrix
+    '''
+    df_android = df[df['OS'] == 'Android'].copy()
+    df_ios = df[df['OS'] == 'iOS'].copy()
+
+    android_result = df_android['Status ' + version].value_counts(normalize=True) * 100
+    ios_result = df_ios['Status ' + version].value_counts(normalize=True) * 100
+
+    df_plot = pd.concat([android_result.rename("Android"), ios_result.rename('iOS')], axis=1).reset_index()
+    df_plot.rename(columns={'Status '+version : 'Status'}, inplace=True)
+
+    df_plot = df_plot.melt(id_vars='Status', var_name='Platform', value_name='Percentage')
+    df_plot['Percentage'] = df_plot['Percentage'].apply(lambda row: round(row, 2))
+
+    return df_plot
+
+
+def engines():
+    names = [FALLBACK_ENGINE]
+    try:
+        import python_calamine  # noqa: F401
+        names.append(FAST_ENGINE)
+    except ImportError:
+        print(f'{FAST_ENGINE} not installed, only {FALLBACK_ENGINE} is checked')
+    return names
+
+
+def check_processing_excel(path):
+    '''
+    Number of sheets compared; raises AssertionError on a difference
+    '''
+    with open(path, 'rb') as f:
+        file_bytes = f.read()
+    sheet_names = pd.ExcelFile(BytesIO(file_bytes)).sheet_names
+    compared = 0
+    for engine in engines():
+        workbook = ptrWorkbook(BytesIO(file_bytes), engine=engine)
+        for sheet_name in sheet_names:
+            where = f'{os.path.basename(path)} / {sheet_name} / {engine}'
+            try:
+                expected = old_processing_excel(BytesIO(file_bytes), sheet_name)
+            except Exception:
+                try:
+                    workbook.ptr_sheet(sheet_name)
+                except Exception:
+                    continue
+                raise AssertionError(f'{where}: the old code fails on this sheet, the new code does not')
+            excel_ptr, listof_ver = workbook.ptr_sheet(sheet_name)
+            assert listof_ver == expected[1], f'{where}: versions {listof_ver} != {expected[1]}'
+            try:
+                assert_frame_equal(excel_ptr, expected[0])
+            except AssertionError as error:
+                raise AssertionError(f'{where}: {error}') from None
+            compared += 1
+    return compared
+
+
+def check_progress_status(path):
+    '''
+    Number of (sheet, version) pairs compared; raises AssertionError on a difference
+    '''
+    workbook = ptrWorkbook(path)
+    compared = 0
+    for sheet_name in workbook.sheet_names:
+        if sheet_name == SUMMARY_SHEET:
+            continue
+        excel_ptr, listof_ver = workbook.ptr_sheet(sheet_name)
+        versions = [str(version).replace('\n', ' ') for version in listof_ver]
+        matrix = build_status_matrix(excel_ptr, versions)
+        for version in versions:
+            # The page showed empty status cells as 'N/A' before calling progress_status
+            page_frame = excel_ptr.assign(**{'Status ' + version: excel_ptr['Status ' + version].fillna(MISSING_STATUS)})
+            where = f'{os.path.basename(path)} / {sheet_name} / {version}'
+            try:
+                assert_frame_equal(version_status(matrix, version), old_progress_status(page_frame, version))
+            except AssertionError as error:
+                raise AssertionError(f'{where}: {error}') from None
+            compared += 1
+    return compared
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('datasets', nargs='*', default=None)
+    parser.add_argument('--scale', type=int, default=SCALE, help='scale of the synthetic workbook for progress_status')
+    args = parser.parse_args()
+    logging.disable(logging.WARNING)
+
+    try:
+        for path in args.datasets or sorted(glob.glob(DATASET_GLOB)):
+            print(f'processing_excel  {os.path.basename(path):<28} {check_processing_excel(path):>4} sheets match')
+        path = synthetic_workbook(args.scale)
+        print(f'progress_status   {os.path.basename(path):<28} {check_progress_status(path):>4} versions match')
+    except AssertionError as error:
+        print(f'MISMATCH {error}')
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,128 @@
+'''
+Local stand-in for the Drive v3 endpoints the app uses, so Drive code can be exercised without network or credentials.
+
+    with fakeDrive({'file-1': b'...'}, latency=0.05) as drive:
+        client = driveClient(AnonymousCredentials(), api_endpoint=drive.endpoint)
+        client.download('file-1')
+
+Supports GET [/drive/v3]/files/<id>?alt=media (with Range, as MediaIoBaseDownload asks for chunks),
+files.list (every file in one page, whatever the query), changes.getStartPageToken and changes.list
+(never any change), a fixed latency per request, and an optional 503 every N requests to exercise retries.
+'''
+import json
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import unquote, urlsplit
+
+# client_options api_endpoint replaces the whole base url, so the /drive/v3 prefix is optional
+MEDIA_PATH = re.compile(r'^(?:/drive/v3)?/files/([^/]+)$')
+LIST_PATH = re.compile(r'^(?:/drive/v3)?/files$')
+START_PAGE_TOKEN_PATH = re.compile(r'^(?:/drive/v3)?/changes/startPageToken$')
+CHANGES_PATH = re.compile(r'^(?:/drive/v3)?/changes$')
+RANGE_HEADER = re.compile(r'bytes=(\d+)-(\d*)')
+
+# Every file has the same modifiedTime and the folder never changes
+MODIFIED_TIME = '2024-11-15T00:00:00.000Z'
+CHANGES_TOKEN = '1'
+
+
+class _handler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'  # keep-alive, like the real endpoint
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send(self, status, body=b'', headers=None):
+        self.send_response(status)
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        drive = self.server.drive
+        request_number = drive._count()
+        if drive.latency:
+            time.sleep(drive.latency)
+        if drive.fail_every and request_number % drive.fail_every == 0:
+            self._send(503, b'{"error": {"code": 503, "message": "Backend Error"}}', {'Content-Type': 'application/json'})
+            return
+
+        url = urlsplit(self.path)
+        metadata = drive._metadata(url.path)
+        if metadata is not None:
+            self._send(200, json.dumps(metadata).encode(), {'Content-Type': 'application/json'})
+            return
+
+        match = MEDIA_PATH.match(url.path)
+        content = drive.files.get(unquote(match.group(1))) if match and 'alt=media' in url.query else None
+        if content is None:
+            self._send(404, b'{"error": {"code": 404, "message": "File not found"}}', {'Content-Type': 'application/json'})
+            return
+
+        byte_range = RANGE_HEADER.match(self.headers.get('Range', ''))
+        if byte_range is None:
+            self._send(200, content)
+            return
+        start = int(byte_range.group(1))
+        end = min(int(byte_range.group(2) or len(content) - 1), len(content) - 1)
+        self._send(206, content[start:end + 1], {'Content-Range': f'bytes {start}-{end}/{len(content)}'})
+
+
+class fakeDrive:
+    '''
+    files: {file_id: bytes}, names: {file_id: file name} (the id when missing).
+    Serves on 127.0.0.1 on a free port, see .endpoint and .requests
+    '''
+
+    def __init__(self, files, latency=0.0, fail_every=0, names=None, modified_time=MODIFIED_TIME):
+        self.files = files
+        self.names = names or {}
+        self.modified_time = modified_time
+        self.latency = latency
+        self.fail_every = fail_every
+        self.requests = 0
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer(('127.0.0.1', 0), _handler)
+        self._server.daemon_threads = True
+        self._server.drive = self
+        self.endpoint = f'http://127.0.0.1:{self._server.server_port}/'
+        self._thread = None
+
+    def _count(self):
+        with self._lock:
+            self.requests += 1
+            return self.requests
+
+    def _metadata(self, path):
+        '''
+        JSON answer of a metadata request (listing, changes), None for anything else
+        '''
+        if LIST_PATH.match(path):
+            return {'files': [
+                {'id': file_id, 'name': self.names.get(file_id, file_id), 'modifiedTime': self.modified_time}
+                for file_id in self.files
+            ]}
+        if START_PAGE_TOKEN_PATH.match(path):
+            return {'startPageToken': CHANGES_TOKEN}
+        if CHANGES_PATH.match(path):
+            return {'changes': [], 'newStartPageToken': CHANGES_TOKEN}
+        return None
+
+    def start(self):
+        self._thread = threading.Thread(target=self._server.serve_forever, name='fake-drive', daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
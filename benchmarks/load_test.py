@@ -0,0 +1,243 @@
+'''
+Load test: N concurrent sessions going through login -> PTR page -> file, sheet and version selection,
+with Streamlit's AppTest driving the real pages (benchmarks/load_test_app.py) in this process, the way
+the server runs every session in one process sharing the st.cache_* caches.
+
+Google Drive is replaced by benchmarks.fake_drive serving the dataset/ workbooks (plus synthetic ones,
+see benchmarks.synthetic_workbook) with a fixed latency per request. The run happens in a fresh
+working directory (user database, disk caches), so the first rerun of the first level is a cold start
+unless --warmup is given.
+
+For every concurrency level the report has the p50 / p95 / p99 / max latency of a rerun (one widget
+interaction, AppTest overhead included), reruns per second, failed reruns (exceptions or missing
+widgets), reruns that showed an st.error, and the resident memory of the process after the level
+and at its peak. Results are also appended as JSON lines to --output.
+
+Run from the repository root:
+    python -m benchmarks.load_test
+    python -m benchmarks.load_test --sessions 1,4,16 --rounds 3 --latency 0.1 --synthetic 10,100
+'''
+import argparse
+import glob
+import json
+import logging
+import os
+import resource
+import statistics
+import tempfile
+import threading
+import time
+from datetime import datetime, timezone
+
+from benchmarks.fake_drive import fakeDrive
+from benchmarks.synthetic_workbook import synthetic_workbook
+
+APP = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'load_test_app.py')
+DATASET_GLOB = os.path.join('dataset', '*.xlsx')
+OUTPUT = os.path.join('benchmarks', 'results', 'load_test.jsonl')
+
+# How load_test_app.py finds the fake Drive
+ENDPOINT_VARIABLE = 'LOAD_TEST_ENDPOINT'
+FOLDER_ID = 'load-test-folder'
+
+SESSIONS = '1,2,4,8'
+PASSWORD = 'loadtest123'
+RERUN_TIMEOUT = 300  # seconds, a rerun of a cold 1000x workbook is slow
+
+FILE_LABEL = 'Select a file'
+SHEET_LABEL = 'Select a sheet'
+VERSION_LABEL = 'Select a PTR version'
+
+
+def rss_mb():
+    '''
+    (current, peak) resident memory of this process in MB
+    '''
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024  # KB on Linux
+    try:
+        with open('/proc/self/statm') as f:
+            current = int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE') / 2 ** 20
+    except OSError:
+        current = float('nan')
+    return current, peak
+
+
+def percentile(values, percent):
+    if len(values) == 1:
+        return values[0]
+    return statistics.quantiles(values, n=100, method='inclusive')[percent - 1]
+
+
+def create_users(count):
+    '''
+    Users loadtest0..N with the 'user' role (straight to the PTR page) in the working directory's user database
+    '''
+    from Components.user_store import userStore
+
+    store = userStore()
+    for number in range(count):
+        store.add_user(f'loadtest{number}', f'loadtest{number}@example.com', PASSWORD, role='user')
+
+
+def share_app_test_state():
+    '''
+    Let AppTest runs overlap in threads, like sessions on one server:
+
+    - one compiled script for every run, like the server's single ScriptCache (AppTest compiles the
+      script again on every run, and concurrent ast.parse calls are not safe on Python 3.11)
+    - the runtime an AppTest installs for its run is never reset to None when the run ends, so a
+      session still running does not lose Runtime.instance() halfway through
+    '''
+    from streamlit.runtime import Runtime
+    from streamlit.runtime.scriptrunner.script_cache import ScriptCache
+    from streamlit.testing.v1 import app_test, local_script_runner
+
+    script_cache = ScriptCache()
+    app_test.ScriptCache = local_script_runner.ScriptCache = lambda: script_cache
+
+    class sharedRuntimeType(type):
+        @property
+        def _instance(cls):
+            return Runtime._instance
+
+        @_instance.setter
+        def _instance(cls, runtime):
+            if runtime is not None:
+                Runtime._instance = runtime
+
+    app_test.Runtime = sharedRuntimeType('Runtime', (Runtime,), {})
+
+
+class session:
+    '''
+    One browser session; every interaction is timed as a rerun
+    '''
+
+    def __init__(self, number, rounds):
+        from streamlit.testing.v1 import AppTest
+
+        self.number = number
+        self.rounds = rounds
+        self.app = AppTest.from_file(APP, default_timeout=RERUN_TIMEOUT)
+        self.reruns = []  # (step, seconds, failed, page_error)
+
+    def _rerun(self, step, action):
+        start = time.perf_counter()
+        try:
+            action()
+            failed = bool(self.app.exception)
+        except Exception:
+            failed = True
+        seconds = time.perf_counter() - start
+        self.reruns.append((step, seconds, failed, not failed and bool(self.app.error)))
+        return not failed
+
+    def _select(self, step, label, pick):
+        '''
+        Pick an option of the selectbox labelled label; False when the page did not get that far
+        (e.g. a sheet without PTR versions stops the page), which ends the round
+        '''
+        widget = next((widget for widget in self.app.selectbox if widget.label == label), None)
+        if widget is None or not widget.options:
+            return False
+        return self._rerun(step, lambda: widget.set_value(pick(widget.options)).run())
+
+    def run(self):
+        if not self._rerun('open', self.app.run):
+            return
+        self.app.text_input[0].input(f'loadtest{self.number}')
+        self.app.text_input[1].input(PASSWORD)
+        login = next(button for button in self.app.button if button.label == 'Login')
+        if not self._rerun('login', login.click().run):
+            return
+
+        # Sessions spread over the files and sheets, like a team looking at different releases
+        for round_number in range(self.rounds):
+            offset = self.number + round_number
+            self._select('file', FILE_LABEL, lambda options: options[offset % len(options)]) and \
+                self._select('sheet', SHEET_LABEL, lambda options: options[offset % len(options)]) and \
+                self._select('version', VERSION_LABEL, lambda options: options[-1])
+
+
+def run_level(sessions, rounds):
+    '''
+    Start `sessions` sessions at once, returns their reruns and the wall time
+    '''
+    runs = [session(number, rounds) for number in range(sessions)]
+    threads = [threading.Thread(target=run.run, name=f'session-{run.number}') for run in runs]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return [rerun for run in runs for rerun in run.reruns], time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sessions', default=SESSIONS, help='comma separated concurrency levels')
+    parser.add_argument('--rounds', type=int, default=2, help='file / sheet / version selections per session')
+    parser.add_argument('--latency', type=float, default=0.05, help='seconds added to every Drive request')
+    parser.add_argument('--synthetic', default='10', help="comma separated synthetic workbook scales, '' for none")
+    parser.add_argument('--warmup', action='store_true', help='one unmeasured session first (warm caches)')
+    parser.add_argument('--workdir', default=None, help='working directory (caches, users), a new temporary one by default')
+    parser.add_argument('--output', default=OUTPUT, help="JSON lines file the results are appended to, '-' for none")
+    args = parser.parse_args()
+    logging.disable(logging.WARNING)
+
+    paths = sorted(glob.glob(DATASET_GLOB))
+    paths += [synthetic_workbook(int(scale)) for scale in args.synthetic.split(',') if scale]
+    files, names = {}, {}
+    for number, path in enumerate(paths):
+        with open(path, 'rb') as f:
+            files[f'file-{number}'] = f.read()
+        names[f'file-{number}'] = os.path.basename(path)
+    levels = [int(level) for level in args.sessions.split(',')]
+    output = os.path.abspath(args.output) if args.output != '-' else None
+
+    os.chdir(args.workdir or tempfile.mkdtemp(prefix='ptr-load-test-'))
+    create_users(max(levels))
+    share_app_test_state()
+
+    run = {'run': datetime.now(timezone.utc).isoformat(timespec='seconds'), 'latency': args.latency, 'files': len(files)}
+    records = []
+    with fakeDrive(files, latency=args.latency, names=names) as drive:
+        os.environ[ENDPOINT_VARIABLE] = drive.endpoint
+        print(f"{len(files)} workbooks on the fake Drive ({args.latency * 1000:.0f} ms per request), working directory {os.getcwd()}")
+        if args.warmup:
+            run_level(1, 1)
+
+        print(f"{'sessions':>8} {'reruns':>7} {'p50 (ms)':>9} {'p95 (ms)':>9} {'p99 (ms)':>9} {'max (ms)':>9} "
+              f"{'reruns/s':>9} {'failed':>7} {'st.error':>9} {'rss (MB)':>9} {'peak (MB)':>10}")
+        for sessions in levels:
+            requests_before = drive.requests
+            reruns, wall = run_level(sessions, args.rounds)
+            current, peak = rss_mb()
+            latencies = [seconds * 1000 for _, seconds, failed, _ in reruns if not failed]
+            record = dict(
+                run, sessions=sessions, reruns=len(reruns), wall_s=wall,
+                failed=sum(failed for _, _, failed, _ in reruns),
+                page_errors=sum(page_error for _, _, _, page_error in reruns),
+                drive_requests=drive.requests - requests_before,
+                rss_mb=current, peak_rss_mb=peak,
+            )
+            if latencies:
+                record.update(
+                    p50_ms=percentile(latencies, 50), p95_ms=percentile(latencies, 95),
+                    p99_ms=percentile(latencies, 99), max_ms=max(latencies),
+                )
+            records.append(record)
+            print(f"{sessions:>8} {len(reruns):>7} {record.get('p50_ms', float('nan')):>9.0f} "
+                  f"{record.get('p95_ms', float('nan')):>9.0f} {record.get('p99_ms', float('nan')):>9.0f} "
+                  f"{record.get('max_ms', float('nan')):>9.0f} {len(reruns) / wall:>9.1f} {record['failed']:>7} "
+                  f"{record['page_errors']:>9} {current:>9.0f} {peak:>10.0f}")
+
+    if output:
+        os.makedirs(os.path.dirname(output), exist_ok=True)
+        with open(output, 'a') as f:
+            f.write(''.join(json.dumps(record) + '\n' for record in records))
+        print(f'\n{len(records)} results appended to {output}')
+
+
+if __name__ == '__main__':
+    main()
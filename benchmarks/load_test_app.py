@@ -0,0 +1,42 @@
+'''
+Streamlit script driven by benchmarks.load_test: the real login page and PTR page, with Google Drive
+replaced by the fakeDrive whose endpoint is in the LOAD_TEST_ENDPOINT environment variable.
+
+The Drive config module (service account file, scopes, folder) is swapped for one pointing at the
+stand-in before any page imports it, and the Drive client is built with anonymous credentials, so
+no secrets or network are needed. Run through benchmarks.load_test, not with `streamlit run`.
+'''
+import os
+import sys
+import types
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+import streamlit as st
+from google.auth.credentials import AnonymousCredentials
+
+from benchmarks.load_test import ENDPOINT_VARIABLE, FOLDER_ID
+from Components.gdrive_database import gdrive_conn
+from Components.gdrive_database.drive_client import driveClient
+
+DRIVE_CONFIG = 'Components.gdrive_database.googledrive_ID'
+if getattr(sys.modules.get(DRIVE_CONFIG), 'PARENT_FOLDER', None) != FOLDER_ID:
+    config = types.ModuleType(DRIVE_CONFIG)
+    config.SCOPE_ID = ['https://www.googleapis.com/auth/drive.readonly']
+    config.SERVICE_ACC_ID = None
+    config.PARENT_FOLDER = FOLDER_ID
+    sys.modules[DRIVE_CONFIG] = config
+
+
+@st.cache_resource
+def get_fake_drive_client(endpoint):
+    return driveClient(AnonymousCredentials(), api_endpoint=endpoint)
+
+
+gdrive_conn.get_drive_client = lambda service_account_file, scopes: get_fake_drive_client(os.environ[ENDPOINT_VARIABLE])
+
+from Components.login_page import loginPage
+
+loginPage().run()
@@ -0,0 +1,133 @@
+'''
+Synthetic PTR workbooks in the layout the page reads, for scale-up benchmarks
+
+Every PTR sheet has the version labels ('PTR Ver ...') in column 1 above the header, a header row
+starting with 'No' / 'Features' / 'Sub Fitur', one Android and one iOS row per test case
+(Features / Sub Fitur / Expected Condition only filled on the first one, like the real sheets)
+and one 'Status <version>' column per version. The '-' sheet has the Android / iOS / Backoffice
+blocks the heatmaps are drawn from.
+
+Scale 1 is about the size of a bundled regression sheet (BASE_ROWS rows); scale 1000 writes
+~128k rows per sheet and takes a minute, so generated files are kept under .cache/benchmarks.
+
+Run from the repository root:
+    python -m benchmarks.synthetic_workbook 10 100 1000
+'''
+import argparse
+import os
+
+import numpy as np
+from openpyxl import Workbook
+
+from ptr.workbook import SUMMARY_SHEET
+
+CACHE_DIR = os.path.join('.cache', 'benchmarks')
+
+# Rows per PTR sheet at scale 1 ('Regresi PTR Tester' in PTR_Nov_2024.xlsx has 128)
+BASE_ROWS = 128
+SHEETS = ['Regresi PTR Tester', 'Regresi PTR PO']
+VERSIONS = ['PTR Ver 1.0.2', 'PTR Ver 1.0.3', 'PTR Ver 1.0.4']
+
+HEADER = [
+    'No', 'Features', 'Sub Fitur', 'Expected Condition', 'OS', 'OS Version', 'Tipe Device HP',
+    'Telko Provider HP', 'Tester', 'Link JIRA',
+]
+TRAILER = ['Link Report Test', 'Description Issue dan Evidence']
+
+STATUSES = ['Passed', 'Failed', 'In Progress', 'Not Started', None]
+STATUS_WEIGHTS = [0.72, 0.08, 0.07, 0.05, 0.08]
+DEVICES = {'Android': ['POCO F6', 'Samsung A54', 'Redmi Note 12'], 'iOS': ['Iphone 12 Pro Max', 'Iphone  14']}
+OS_VERSIONS = {'Android': '14', 'iOS': '17.6.1'}
+
+# Test cases per sub feature / sub features per feature
+CASES_PER_SUB_FEATURE = 4
+SUB_FEATURES_PER_FEATURE = 5
+
+
+def ptr_sheet_rows(rows, versions, rng):
+    '''
+    Rows (lists of cells) of one PTR sheet with `rows` data rows
+    '''
+    yield [None, 'Judul / Envi : Regresi / PTR (synthetic)']
+    for version in versions:
+        yield ['PTR', version]
+    yield []
+    yield HEADER + ['Status ' + version for version in versions] + TRAILER
+
+    statuses = rng.choice(len(STATUSES), size=(rows, len(versions)), p=STATUS_WEIGHTS)
+    for row in range(rows):
+        case, platform = divmod(row, 2)
+        os_name = 'Android' if platform == 0 else 'iOS'
+        sub_feature = case // CASES_PER_SUB_FEATURE
+        feature = sub_feature // SUB_FEATURES_PER_FEATURE
+        first = platform == 0
+        yield [
+            case + 1 if first else None,
+            f'Feature {feature}' if first and case % (CASES_PER_SUB_FEATURE * SUB_FEATURES_PER_FEATURE) == 0 else None,
+            f'Sub feature {sub_feature}' if first and case % CASES_PER_SUB_FEATURE == 0 else None,
+            f'Expected condition {case}' if first else None,
+            os_name,
+            OS_VERSIONS[os_name],
+            DEVICES[os_name][case % len(DEVICES[os_name])],
+            None,
+            f'Tester {case % 9}',
+            f'https://jira.example.com/browse/PTR-{feature}' if first and case % 3 == 0 else None,
+        ] + [STATUSES[code] for code in statuses[row]] + [None, None]
+
+
+def summary_sheet_rows(sheet_names, rng):
+    '''
+    Rows of the '-' sheet: one block per platform, fractions per PTR sheet, blocks separated by an empty row
+    '''
+    metrics = ['Passed', 'Failed', 'In Progress', 'Not Started']
+    for platform in ['Android', 'iOS', 'Backoffice']:
+        yield [platform] + metrics
+        for sheet_name in sheet_names:
+            fractions = rng.dirichlet(np.ones(len(metrics)))
+            yield [sheet_name] + [round(float(value), 4) for value in fractions]
+        yield []
+
+
+def write_workbook(path, scale, sheets=SHEETS, versions=VERSIONS, seed=0):
+    '''
+    Write a synthetic PTR workbook with BASE_ROWS * scale rows per PTR sheet to path
+    '''
+    rng = np.random.default_rng(seed)
+    workbook = Workbook(write_only=True)
+    for sheet_name in sheets:
+        sheet = workbook.create_sheet(sheet_name)
+        for row in ptr_sheet_rows(BASE_ROWS * scale, versions, rng):
+            sheet.append(row)
+    summary = workbook.create_sheet(SUMMARY_SHEET)
+    for row in summary_sheet_rows(sheets, rng):
+        summary.append(row)
+
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    partial = path + '.part'
+    workbook.save(partial)
+    os.replace(partial, path)
+    return path
+
+
+def synthetic_workbook(scale, cache_dir=CACHE_DIR):
+    '''
+    Path of the synthetic workbook at scale, generated the first time it is asked for
+    '''
+    path = os.path.join(cache_dir, f'synthetic_ptr_x{scale}.xlsx')
+    if not os.path.exists(path):
+        write_workbook(path, scale)
+    return path
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('scales', nargs='*', type=int, default=[10, 100, 1000])
+    args = parser.parse_args()
+
+    for scale in args.scales:
+        path = synthetic_workbook(scale)
+        print(f'x{scale:<6} {BASE_ROWS * scale:>8} rows / sheet  {os.path.getsize(path) / 1e6:>8.1f} MB  {path}')
+
+
+if __name__ == '__main__':
+    main()
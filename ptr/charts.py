@@ -0,0 +1,217 @@
+from ptr.sankey_flow import DEFAULT_NODE_BUDGET, build_sankey_flows
+from ptr.summary_sheet import SUMMARY_PLATFORMS, summary_heatmap
+
+# Figures of the PTR dashboard; plotly is imported inside the builders, not when the page module is loaded
+
+
+def progress_plot(df_plot):
+    import plotly.express as px
+
+    progress_bar = px.bar(
+        df_plot,
+        x="Status",
+        y="Percentage",
+        color="Platform",
+        barmode="group",
+        text="Percentage",
+        color_discrete_map={"Android": "#71BC68", "iOS": "rgba(70, 130, 180, 0.8)"}  # Custom colors
+    )
+
+    # Customize the traces for better readability
+    progress_bar.update_traces(
+        texttemplate='%{text:.2f}%',
+        textposition='outside',
+        marker=dict(cornerradius='30%' ,line=dict(width=1.5, color="black"))  # Add a border to bars
+    )
+
+    # Update layout for a cleaner and professional look
+    progress_bar.update_layout(
+        xaxis=dict(
+            title="<b style='color: #ffbd44;'>Status</b>",
+            tickfont=dict(size=12, family="Arial, sans-serif"),
+        ),
+        yaxis=dict(
+            title="<b style='color: #ffbd44;'>Percentage (%)</b>",
+            tickfont=dict(size=12, family="Arial, sans-serif"),
+        ),
+        legend=dict(
+            title="<b> </b>",
+            font=dict(size=12, family="Arial, sans-serif"),
+            bgcolor="#1E1E1E",  # Light gray background for legend
+            borderwidth=0,
+            orientation="h",
+            yanchor="bottom",
+            y=1.02,
+            xanchor="center",
+            x=0.5,
+            font_size=16
+        ),
+        margin=dict(l=50, r=50, t=20, b=0),  # Adjust margins for spacing
+        plot_bgcolor="rgba(0,0,0,0)",  # Transparent plot background
+        paper_bgcolor="#1E1E1E",  # Light gray background
+        font_size=14,
+        height=500
+    )
+    
+    return progress_bar
+
+
+def sankey_plot(excel_ptr, status_column, primary_column, show_all_nodes=False):
+    import plotly.graph_objects as go
+
+    # Build nodes and links for the selected PTR version
+    flows = build_sankey_flows(
+        excel_ptr, status_column, primary_column,
+        node_budget=None if show_all_nodes else DEFAULT_NODE_BUDGET
+    )
+
+    fig = go.Figure(data=[go.Sankey(
+        node=dict(
+            pad=15,
+            thickness=20,
+            line=dict(color="black", width=0.5),
+            label=flows['labels'],  # Use short labels here
+            color=flows['node_colors'],  # Optionally set a default color
+            customdata=flows['customdata'],
+            hovertemplate="%{customdata}<extra></extra>"
+        ),
+        link=dict(
+            source=flows['sources'],
+            target=flows['targets'],
+            value=flows['values'],
+            color=flows['link_colors']
+        )
+    )])
+
+    # Update layout and show
+    fig.update_layout(
+        font_size=12,
+        # width=500,  # Increase width for a wider graph
+        height=500,   # Increase height for a taller graph
+        font=dict(size=14, color='white'),
+        plot_bgcolor='#1E1E1E',
+        paper_bgcolor='#1E1E1E',
+        margin=dict(l=20, r=20, t=20, b=20)
+    )
+
+    return fig
+
+
+def heatmap_plot(summary):
+    import plotly.graph_objects as go
+    from plotly.subplots import make_subplots
+
+    heatmap_data1, heatmap_data2, heatmap_data3 = [summary_heatmap(summary, platform) for platform in SUMMARY_PLATFORMS]
+
+    graph = make_subplots(
+        rows=3, cols=1,
+        subplot_titles=("<b>Android Metrics</b>", "<b>iOS Metrics</b>", "<b>Backoffice Metrics</b>"),
+        vertical_spacing=0.15
+    )
+
+    # Define a custom colorscale
+    custom_colorscale = [
+        [0, "#1e1e1e"],  # Light gray
+        [0.25, "#add8e6"],  # Light blue
+        [0.5, "#87ceeb"],  # Sky blue
+        [0.75, "#4682b4"],  # Steel blue
+        [1, "#3c5d7c"],  # Navy
+    ]
+
+    # Add heatmaps with smaller tiles and bigger text
+    tile_gap = 2  # Adjust gap size for smaller tiles
+    text_size = 16  # Increase text size
+
+    graph.add_trace(
+        go.Heatmap(
+            z=heatmap_data1.values,
+            x=heatmap_data1.columns,
+            y=heatmap_data1.index,
+            colorscale=custom_colorscale,
+            showscale=True,  # Single color legend
+            colorbar=dict(title=" ", thickness=15, len=0.3, x=1.02),
+            text=heatmap_data1.values,  # Add text data
+            texttemplate="%{text:.2f}",  # Format text (2 decimal places)
+            textfont=dict(color="white", size=text_size),  # Set text color and size
+            xgap=tile_gap,  # Reduce gap for smaller tiles
+            ygap=tile_gap
+        ),
+        row=1, col=1
+    )
+
+    graph.add_trace(
+        go.Heatmap(
+            z=heatmap_data2.values,
+            x=heatmap_data2.columns,
+            y=heatmap_data2.index,
+            colorscale=custom_colorscale,
+            showscale=False,  # No separate legend for this heatmap
+            text=heatmap_data2.values,  # Add text data
+            texttemplate="%{text:.2f}",  # Format text (2 decimal places)
+            textfont=dict(color="white", size=text_size),  # Set text color and size
+            xgap=tile_gap,  # Reduce gap for smaller tiles
+            ygap=tile_gap
+        ),
+        row=2, col=1
+    )
+
+    graph.add_trace(
+        go.Heatmap(
+            z=heatmap_data3.values,
+            x=heatmap_data3.columns,
+            y=heatmap_data3.index,
+            colorscale=custom_colorscale,
+            showscale=False,  # No separate legend for this heatmap
+            text=heatmap_data3.values,  # Add text data
+            texttemplate="%{text:.2f}",  # Format text (2 decimal places)
+            textfont=dict(color="white", size=text_size),  # Set text color and size
+            xgap=tile_gap,  # Reduce gap for smaller tiles
+            ygap=tile_gap
+        ),
+        row=3, col=1
+    )
+    # Update layout
+    graph.update_layout(
+        title_text=" ",
+        height=900,
+        width=800,
+        template="plotly_dark",  # Apply dark theme
+        font=dict(size=12, color="white"),
+        title_font=dict(size=12, color="white"),
+        plot_bgcolor="#1e1e1e",  # Dark background
+        paper_bgcolor="#1e1e1e",  # Dark background
+        yaxis=dict(
+            title_font=dict(size=15, color="white"),  # Larger and bold font
+            tickfont=dict(size=15, color="white")  # Larger y-tick font
+        ),
+        xaxis=dict(
+            title_font=dict(size=15, color="white"),  # Larger and bold font
+            tickfont=dict(size=15, color="white")  # Larger y-tick font
+        ),
+        yaxis2=dict(
+            title_font=dict(size=15, color="white"),
+            tickfont=dict(size=15, color="white")
+        ),
+        xaxis2=dict(
+            title_font=dict(size=15, color="white"),  # Larger and bold font
+            tickfont=dict(size=15, color="white")  # Larger y-tick font
+        ),
+        yaxis3=dict(
+            title_font=dict(size=15, color="white"),
+            tickfont=dict(size=15, color="white")
+        ),
+        xaxis3=dict(
+            title_font=dict(size=13, color="white"),  # Larger and bold font
+            tickfont=dict(size=13, color="white")  # Larger y-tick font
+        ),
+
+        margin=dict(l=0, r=0, t=50, b=20)
+    )
+
+    # Ensure the same style applies across multiple y-axes if using subplots
+    graph.update_yaxes(
+        title_font=dict(size=14, color="white"),
+        tickfont=dict(size=14, color="white")
+    )
+
+    return graph
@@ -0,0 +1,121 @@
+import math
+
+import numpy as np
+import pandas as pd
+
+# Data Sheet tab: rows are filtered, sorted, grouped and paged here, the grid only gets the visible page
+PAGE_SIZES = [25, 50, 100, 200]
+DEFAULT_PAGE_SIZE = 50
+
+# Same grouping as the old client-side rowGroup columns
+GROUP_COLUMNS = ['Features', 'Sub-features', 'Expected Condition']
+GROUP_SEPARATOR = ' › '
+ROWS_LABEL = 'Rows'
+
+# Columns are addressed by position: PTR sheets have duplicated and empty headers
+
+
+def column_names(excel_ptr):
+    '''
+    Unique, printable names for the columns of excel_ptr (duplicates get a ' (2)' suffix)
+    '''
+    names = []
+    for label in excel_ptr.columns:
+        name = '' if pd.isna(label) else str(label).replace('\n', ' ')
+        candidate, suffix = name, 1
+        while candidate in names:
+            suffix += 1
+            candidate = f'{name} ({suffix})'
+        names.append(candidate)
+    return names
+
+
+def _as_text(column):
+    # Missing cells are searched / shown as empty text, everything else as it is displayed
+    return column.astype(str).where(column.notna(), '')
+
+
+def column_values(excel_ptr, position):
+    '''
+    Distinct values (as text) of the column at position, for the filter choices
+    '''
+    return sorted(_as_text(excel_ptr.iloc[:, position]).unique())
+
+
+def query_rows(excel_ptr, search='', column_filters=None, sort_by=None, ascending=True):
+    '''
+    Row positions of excel_ptr matching the search text (case insensitive, any column) and
+    column_filters {column position: [allowed values as text]}, ordered by the column at
+    position sort_by (stable, ties keep the sheet order, missing values last)
+    '''
+    mask = np.ones(len(excel_ptr), dtype=bool)
+    for position, values in (column_filters or {}).items():
+        if values:
+            mask &= _as_text(excel_ptr.iloc[:, position]).isin(values).to_numpy()
+
+    if search:
+        search = search.lower()
+        matches = np.zeros(len(excel_ptr), dtype=bool)
+        for position in range(excel_ptr.shape[1]):
+            matches |= _as_text(excel_ptr.iloc[:, position]).str.lower().str.contains(search, regex=False).to_numpy()
+        mask &= matches
+
+    positions = np.flatnonzero(mask)
+    if sort_by is not None and len(positions):
+        column = excel_ptr.iloc[positions, sort_by]
+        # Numbers sort as numbers, anything else by its text
+        numeric = pd.to_numeric(column, errors='coerce')
+        if numeric.notna().sum() == column.notna().sum():
+            keys = numeric
+        else:
+            keys = column.astype(str).str.lower().where(column.notna())
+        codes, _ = pd.factorize(keys, sort=True)
+        ranks = np.where(codes < 0, np.nan, codes)
+        positions = positions[np.argsort(ranks if ascending else -ranks, kind='stable')]
+    return positions
+
+
+def group_rows(excel_ptr, positions, group_by):
+    '''
+    Groups (by the columns at positions group_by) of the selected rows, in order of first appearance.
+    Returns (summary, members): summary has one column per group column plus a 'Rows' count,
+    members[i] are the row positions of summary row i.
+    '''
+    selected = excel_ptr.iloc[positions]
+    grouped = selected.groupby([selected.iloc[:, position] for position in group_by], dropna=False, sort=False)
+    groups = sorted(grouped.indices.items(), key=lambda group: group[1][0])
+    keys = [key if len(group_by) > 1 else (key,) for key, _ in groups]
+    members = [positions[indices] for _, indices in groups]
+
+    names = column_names(excel_ptr)
+    summary = pd.DataFrame(keys, columns=[names[position] for position in group_by])
+    summary = summary.astype(object).where(summary.notna(), '')
+    summary[ROWS_LABEL] = [len(rows) for rows in members]
+    return summary, members
+
+
+def group_label(summary_row, group_by_names):
+    return GROUP_SEPARATOR.join(str(summary_row[name]) for name in group_by_names)
+
+
+def page_count(total, page_size):
+    return max(1, math.ceil(total / page_size))
+
+
+def page_slice(items, page, page_size):
+    '''
+    Items on page (1-based), clipped to the last page
+    '''
+    page = min(max(page, 1), page_count(len(items), page_size))
+    return items[(page - 1) * page_size:page * page_size]
+
+
+def display_frame(excel_ptr, positions):
+    '''
+    Rows at positions as text with unique string column names, the only part sent to the grid
+    '''
+    rows = excel_ptr.iloc[positions]
+    return pd.DataFrame(
+        {name: _as_text(rows.iloc[:, position]).to_numpy() for position, name in enumerate(column_names(excel_ptr))},
+        index=range(len(rows))
+    )
@@ -0,0 +1,37 @@
+import streamlit as st
+
+from Components.memory_cache import get_memory_cache, size_of
+
+
+def figure_size(figure):
+    '''
+    Bytes charged for a Plotly figure: its traces and layout as plain dicts / lists / arrays
+    (to_plotly_json), sys.getsizeof would only see the wrapper object
+    '''
+    return size_of(figure.to_plotly_json())
+
+
+class figureCache:
+    '''
+    Plotly figures built once and shared by every rerun and session, kept in the process memoryCache
+    next to the workbooks and sheets they are built from: one byte budget, one LRU and one admin panel.
+
+    Keys are tuples (kind, file id, modifiedTime, ...), e.g. ('sankey', file_id, modified_time,
+    sheet_name, version, show_all_nodes), so memoryCache.remove() drops the figures of a file (version)
+    together with its other entries. Sessions asking for the same missing figure at the same time share
+    one build. Cached figures are shared: callers pass them to st.plotly_chart and never modify them.
+    '''
+
+    def __init__(self, memory):
+        self.memory = memory
+
+    def get_or_build(self, key, build):
+        return self.memory.get_or_load(key, build, measure=figure_size)
+
+
+@st.cache_resource
+def get_figure_cache():
+    '''
+    One figureCache per process, on the process memory cache
+    '''
+    return figureCache(get_memory_cache())
@@ -0,0 +1,214 @@
+import textwrap
+
+import numpy as np
+import pandas as pd
+from plotly.colors import qualitative
+
+# Status yang langsung mengalir Feature -> Status -> OS
+PASSED_STATUS = "Passed"
+
+# Status yang mengalir lewat sub-feature dulu: Feature -> Sub-feature -> Status -> OS
+DETAILED_STATUSES = ["Failed", "N/A", "In Progress", "Not Started"]
+
+# Level of detail: above this many nodes the rarest sub-features / features are folded together
+DEFAULT_NODE_BUDGET = 60
+OTHER_PRIMARY_LABEL = "Other"
+OTHER_SUB_FEATURE_LABEL = "Other sub-features"
+
+DEFAULT_NODE_COLOR = "rgba(200, 200, 200, 0.8)"
+DEFAULT_LINK_COLOR = "rgba(192, 192, 192, 0.3)"
+
+
+def short_label(node, width=30):
+    '''
+    Short label for a Sankey node, the full name stays in the hover text
+    '''
+    return (str(node)[:width] + "...") if isinstance(node, str) and len(str(node)) > width else str(node)
+
+
+def wrap_long_name(name, width=50):
+    return '<br>'.join(textwrap.wrap(str(name), width))
+
+
+def link_color(node_color):
+    '''
+    Same color as the source node, but with reduced opacity for the links
+    '''
+    rgba_values = node_color.strip("rgba()").split(",")
+    if len(rgba_values) == 4:
+        r, g, b, _ = map(float, rgba_values[:4])
+        return f"rgba({int(r)}, {int(g)}, {int(b)}, 0.3)"
+    return DEFAULT_LINK_COLOR
+
+
+def hex_to_rgba(hex_color, alpha=1):
+    '''
+    '#RRGGBB' -> 'rgba(r, g, b, alpha)'
+    '''
+    hex_color = hex_color.lstrip('#')
+    r, g, b = (int(hex_color[i:i + 2], 16) for i in (0, 2, 4))
+    return f"rgba({r}, {g}, {b}, {alpha})"
+
+
+def get_node_colors(excel_ptr, primary_column):
+    '''
+    Map node -> color: palette untuk feature / JIRA, abu-abu untuk sub-feature, warna tetap untuk status dan OS
+    '''
+    color_palette = qualitative.Light24
+    num_colors = len(color_palette)
+
+    opacity = 1
+    node_colors = {}
+    primary_values = excel_ptr[primary_column].unique()
+    for i, primary_value in enumerate(primary_values):
+        node_colors[primary_value] = hex_to_rgba(color_palette[i % num_colors], alpha=opacity)
+
+    # Every sub-feature that belongs to a feature is drawn in gray
+    has_primary = excel_ptr[primary_column].notna()
+    for sub_feature in excel_ptr.loc[has_primary, 'Sub-features'].unique():
+        node_colors[sub_feature] = DEFAULT_NODE_COLOR
+
+    node_colors["Passed"] = "rgba(144, 238, 144, 0.8)"  # Soft green
+    node_colors["Failed"] = "rgba(205, 92, 92, 0.8)"    # Soft red brick
+
+    node_colors["Android"] = "#71BC68"                  # Green turquoise
+    node_colors["iOS"] = "rgba(70, 130, 180, 0.8)"      # Steel blue
+
+    return node_colors
+
+
+def fold_rare_nodes(excel_ptr, status_column, primary_column, node_budget=DEFAULT_NODE_BUDGET):
+    '''
+    Level-of-detail pruning: fold the least frequent sub-features, then features / JIRA links,
+    into an "Other" node so the Sankey never has more than node_budget nodes.
+
+    Returns the frame unchanged when it already fits the budget, otherwise a copy with the folded values.
+    '''
+    status = excel_ptr[status_column]
+    is_detailed = status.isin(DETAILED_STATUSES)
+    is_linked = is_detailed | (status == PASSED_STATUS)
+
+    primary_counts = excel_ptr.loc[is_linked, primary_column].value_counts()
+    sub_feature_counts = excel_ptr.loc[is_detailed, 'Sub-features'].value_counts()
+
+    fixed_nodes = status[is_linked].nunique() + excel_ptr.loc[is_linked, 'OS'].nunique()
+    available = max(node_budget - fixed_nodes, 2)
+
+    if len(primary_counts) + len(sub_feature_counts) <= available:
+        return excel_ptr
+
+    # Features keep at most half of the budget, sub-features get the rest (one slot per level goes to "Other")
+    keep_primary = len(primary_counts) if len(primary_counts) <= available // 2 else max(available // 2 - 1, 1)
+    primary_nodes = keep_primary + (keep_primary < len(primary_counts))
+    sub_feature_budget = available - primary_nodes
+    keep_sub_features = len(sub_feature_counts) if len(sub_feature_counts) <= sub_feature_budget else max(sub_feature_budget - 1, 0)
+
+    folded = excel_ptr.copy()
+    if keep_primary < len(primary_counts):
+        kept = primary_counts.index[:keep_primary]
+        folded[primary_column] = folded[primary_column].where(folded[primary_column].isin(kept), OTHER_PRIMARY_LABEL)
+    if keep_sub_features < len(sub_feature_counts):
+        kept = sub_feature_counts.index[:keep_sub_features]
+        folded['Sub-features'] = folded['Sub-features'].where(folded['Sub-features'].isin(kept), OTHER_SUB_FEATURE_LABEL)
+    return folded
+
+
+def aggregate_links(sources, targets):
+    '''
+    Merge duplicate source -> target pairs into one weighted link, in order of first appearance
+    '''
+    links = pd.DataFrame({'source': sources, 'target': targets})
+    links = links.groupby(['source', 'target'], sort=False).size().reset_index(name='value')
+    return links['source'].to_numpy(), links['target'].to_numpy(), links['value'].to_numpy()
+
+
+def build_sankey_flows(excel_ptr, status_column, primary_column=None, aggregate=True, node_budget=None):
+    '''
+    Build the Sankey nodes and links (Feature/Link JIRA -> Sub-features -> Status -> OS) in linear time.
+
+    With aggregate=True every distinct source -> target pair becomes one weighted link and nodes
+    without links are dropped; node_budget turns on the level-of-detail folding (see fold_rare_nodes).
+    Returns a dict with the node labels, hover text and colors, plus the link
+    sources, targets, values and colors, ready to be passed to go.Sankey.
+    '''
+    if primary_column is None:
+        primary_column = "Link JIRA" if "Link JIRA" in excel_ptr.columns else "Features"
+
+    if node_budget is not None:
+        excel_ptr = fold_rare_nodes(excel_ptr, status_column, primary_column, node_budget)
+
+    node_columns = [primary_column, 'Sub-features', 'OS', 'OS Version', 'Tipe Device HP', status_column]
+
+    # Unique nodes in order of first appearance, looked up through a hash index instead of list.index
+    nodes = pd.Index(pd.unique(pd.concat([excel_ptr[column] for column in node_columns], ignore_index=True)))
+
+    primary_codes = nodes.get_indexer(excel_ptr[primary_column])
+    sub_feature_codes = nodes.get_indexer(excel_ptr['Sub-features'])
+    status_codes = nodes.get_indexer(excel_ptr[status_column])
+    os_codes = nodes.get_indexer(excel_ptr['OS'])
+
+    status = excel_ptr[status_column]
+    is_passed = (status == PASSED_STATUS).to_numpy()
+    is_detailed = status.isin(DETAILED_STATUSES).to_numpy()
+
+    # Each row contributes up to three links, laid out per row so the original row order is kept:
+    #   Passed   : Feature -> Status, Status -> OS
+    #   detailed : Feature -> Sub-feature, Sub-feature -> Status, Status -> OS
+    row_sources = np.column_stack([
+        primary_codes,
+        np.where(is_passed, status_codes, sub_feature_codes),
+        status_codes,
+    ])
+    row_targets = np.column_stack([
+        np.where(is_passed, status_codes, sub_feature_codes),
+        np.where(is_passed, os_codes, status_codes),
+        os_codes,
+    ])
+    row_mask = np.column_stack([
+        is_passed | is_detailed,
+        is_passed | is_detailed,
+        is_detailed,
+    ])
+
+    sources = row_sources[row_mask]
+    targets = row_targets[row_mask]
+    values = np.ones(len(sources), dtype=int)
+
+    node_positions = np.arange(len(nodes))
+    if aggregate:
+        sources, targets, values = aggregate_links(sources, targets)
+
+        # Keep only the nodes that are part of a link, re-numbered in their original order
+        node_positions = np.unique(np.concatenate([sources, targets]))
+        new_index = np.full(len(nodes), -1)
+        new_index[node_positions] = np.arange(len(node_positions))
+        nodes = nodes[node_positions]
+        sources = new_index[sources]
+        targets = new_index[targets]
+
+    # Incoming and outgoing flows per node
+    outgoing_flows = np.bincount(sources, weights=values, minlength=len(nodes)).astype(int)
+    incoming_flows = np.bincount(targets, weights=values, minlength=len(nodes)).astype(int)
+
+    customdata = [
+        f"{wrap_long_name(node)} <br>Incoming: {incoming} <br>Outgoing: {outgoing}"
+        for node, incoming, outgoing in zip(nodes, incoming_flows.tolist(), outgoing_flows.tolist())
+    ]
+
+    node_colors = get_node_colors(excel_ptr, primary_column)
+    node_color_list = [node_colors.get(node, DEFAULT_NODE_COLOR) for node in nodes]
+
+    # Link color only depends on the source node, so compute it once per node
+    link_color_by_node = np.array(
+        [link_color(node_colors.get(node, DEFAULT_LINK_COLOR)) for node in nodes], dtype=object
+    )
+
+    return {
+        'labels': [short_label(node) for node in nodes],
+        'customdata': customdata,
+        'node_colors': node_color_list,
+        'sources': sources.tolist(),
+        'targets': targets.tolist(),
+        'values': values.tolist(),
+        'link_colors': link_color_by_node[sources].tolist(),
+    }
@@ -0,0 +1,257 @@
+import datetime
+import hashlib
+import json
+import os
+import shutil
+import threading
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import streamlit as st
+
+from Components.disk_files import atomic_write, evict_lru, remove_file
+
+# Processed PTR sheets as Arrow IPC files, keyed by file id / modifiedTime / sheet name
+CACHE_DIR = os.path.join('.cache', 'ptr_sheets')
+CACHE_MAX_BYTES = 1024 * 1024 * 1024  # 1 GB
+
+# Layout of the files; a file written with another layout is a miss and gets rewritten
+CACHE_FORMAT = '2'
+
+# How each column is written, so the frame read back is identical to the one processing_excel built
+NATIVE = 'native'          # numeric / datetime / string dtype columns, stored as is
+STR_OBJECT = 'str_object'  # object columns holding only strings (and NaN), stored as Arrow strings
+TAGGED = 'tagged'          # object columns with mixed values (e.g. OS Version: 14, '17.6.1', NaN), stored as
+                           # the text of each value plus a '<position>.type' column with its type tag
+
+# Type tags of the values of a TAGGED column (and of the column labels)
+NULL = 'null'
+NAT = 'nat'
+BOOL = 'bool'
+INT = 'int'
+FLOAT = 'float'
+STR = 'str'
+DATETIME = 'datetime'
+DATE = 'date'
+TIME = 'time'            # stored as microseconds since midnight
+TIMEDELTA = 'timedelta'  # stored as microseconds
+
+MICROSECOND = datetime.timedelta(microseconds=1)
+
+
+def _digest(value):
+    return hashlib.sha1(str(value).encode('utf-8')).hexdigest()[:16]
+
+
+def _column_mode(column):
+    if column.dtype != object:
+        return NATIVE
+    values = column.dropna()
+    if len(values) and all(isinstance(value, str) for value in values):
+        return STR_OBJECT
+    return TAGGED
+
+
+def _tag(value):
+    '''
+    (type tag, text) of one cell; TypeError for a type the cache cannot rebuild
+    '''
+    if value is None:
+        return NULL, None
+    if value is pd.NaT:
+        return NAT, None
+    if isinstance(value, (bool, np.bool_)):
+        return BOOL, str(bool(value))
+    if isinstance(value, (int, np.integer)):
+        return INT, str(int(value))
+    if isinstance(value, (float, np.floating)):
+        return FLOAT, repr(float(value))
+    if isinstance(value, str):
+        return STR, value
+    if isinstance(value, datetime.datetime):
+        return DATETIME, value.isoformat()
+    if isinstance(value, datetime.date):
+        return DATE, value.isoformat()
+    if isinstance(value, datetime.time):
+        since_midnight = datetime.datetime.combine(datetime.date.min, value) - datetime.datetime.min
+        return TIME, str(since_midnight // MICROSECOND)
+    if isinstance(value, datetime.timedelta):
+        return TIMEDELTA, str(value // MICROSECOND)
+    raise TypeError(f'{type(value).__name__} values cannot be cached')
+
+
+def _microseconds(text):
+    return pd.to_timedelta(text.astype(np.int64), unit='us')
+
+
+# Tag -> rebuild of the values with that tag from their texts (a numpy object array)
+_UNTAG = {
+    NULL: lambda text: None,
+    NAT: lambda text: pd.NaT,
+    BOOL: lambda text: text == 'True',
+    INT: lambda text: text.astype(np.int64),
+    FLOAT: lambda text: text.astype(np.float64),
+    STR: lambda text: text,
+    DATETIME: lambda text: pd.to_datetime(text, format='ISO8601').to_pydatetime(),
+    DATE: lambda text: pd.to_datetime(text, format='ISO8601').date,
+    TIME: lambda text: (pd.Timestamp(0) + _microseconds(text)).time,
+    TIMEDELTA: lambda text: _microseconds(text).to_pytimedelta(),
+}
+
+
+def _untag(text, tags):
+    '''
+    Object array of the values, one vectorised cast per tag present
+    '''
+    values = np.empty(len(text), dtype=object)
+    for tag in pd.unique(tags):
+        mask = tags == tag
+        values[mask] = _UNTAG[tag](text[mask])
+    return values
+
+
+def frame_to_table(excel_ptr, listof_ver):
+    '''
+    Convert a processed PTR frame to an Arrow table; column labels, per-column modes and
+    the PTR versions go into the schema metadata as JSON
+    '''
+    modes = []
+    arrays = {}
+    for position in range(excel_ptr.shape[1]):
+        column = excel_ptr.iloc[:, position].reset_index(drop=True)
+        mode = _column_mode(column)
+        if mode == TAGGED:
+            tagged = [_tag(value) for value in column]
+            arrays[f'{position}.type'] = pd.Categorical([tag for tag, _ in tagged])
+            column = pd.Series([text for _, text in tagged], dtype=object)
+        modes.append(mode)
+        arrays[str(position)] = column
+
+    # Labels are stored separately: sheets have duplicated and NaN headers which Arrow cannot name columns with
+    positional = pd.DataFrame(arrays, index=pd.RangeIndex(len(excel_ptr)))
+    table = pa.Table.from_pandas(positional, preserve_index=False)
+
+    metadata = dict(table.schema.metadata or {})
+    metadata[b'ptr_format'] = CACHE_FORMAT.encode('utf-8')
+    metadata[b'ptr_columns'] = json.dumps({
+        'dtype': str(excel_ptr.columns.dtype),
+        'labels': [_tag(label) for label in excel_ptr.columns],
+    }).encode('utf-8')
+    metadata[b'ptr_modes'] = json.dumps(modes).encode('utf-8')
+    metadata[b'ptr_versions'] = json.dumps(listof_ver).encode('utf-8')
+    return table.replace_schema_metadata(metadata)
+
+
+def table_to_frame(table):
+    '''
+    Inverse of frame_to_table, returns (excel_ptr, listof_ver)
+    '''
+    metadata = table.schema.metadata
+    modes = json.loads(metadata[b'ptr_modes'])
+    excel_ptr = table.to_pandas()
+    for position, mode in enumerate(modes):
+        name = str(position)
+        if mode == STR_OBJECT:
+            excel_ptr[name] = excel_ptr[name].astype(object).where(excel_ptr[name].notna(), np.nan)
+        elif mode == TAGGED:
+            text = excel_ptr[name].to_numpy(dtype=object)
+            tags = excel_ptr.pop(f'{name}.type').to_numpy(dtype=object)
+            # dtype=object keeps NaN next to datetimes instead of inferring a datetime column with NaT
+            excel_ptr[name] = pd.Series(_untag(text, tags), index=excel_ptr.index, dtype=object)
+
+    labels = json.loads(metadata[b'ptr_columns'])
+    tags = np.array([tag for tag, _ in labels['labels']], dtype=object)
+    texts = np.array([text for _, text in labels['labels']], dtype=object)
+    excel_ptr.columns = pd.Index(_untag(texts, tags), dtype=labels['dtype'])
+    return excel_ptr, json.loads(metadata[b'ptr_versions'])
+
+
+class sheetFrameCache:
+    '''
+    On-disk cache of processed sheets: <cache_dir>/<file id>/<modifiedTime hash>/<sheet hash>.arrow
+
+    Files are Arrow IPC (uncompressed) so they are read back through a memory map instead of
+    a fresh Excel parse. Writing a new modifiedTime drops the older versions of the same file,
+    and the least recently used sheets are evicted once the cache grows over max_bytes.
+    '''
+
+    def __init__(self, cache_dir=CACHE_DIR, max_bytes=CACHE_MAX_BYTES):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def _path(self, file_id, modified_time, sheet_name):
+        return os.path.join(self.cache_dir, file_id, _digest(modified_time), f'{_digest(sheet_name)}.arrow')
+
+    def get(self, file_id, modified_time, sheet_name):
+        '''
+        Return (excel_ptr, listof_ver) or None when the sheet was never processed for this version
+        '''
+        path = self._path(file_id, modified_time, sheet_name)
+        try:
+            with pa.memory_map(path, 'r') as source:
+                table = pa.ipc.open_file(source).read_all()
+            os.utime(path)  # mark as recently used
+        except FileNotFoundError:
+            return None
+        if (table.schema.metadata or {}).get(b'ptr_format') != CACHE_FORMAT.encode('utf-8'):
+            return None  # written with an older layout, processed again and rewritten
+        return table_to_frame(table)
+
+    def contains(self, file_id, modified_time, sheet_name):
+        return os.path.exists(self._path(file_id, modified_time, sheet_name))
+
+    def put(self, file_id, modified_time, sheet_name, excel_ptr, listof_ver):
+        '''
+        Store a processed sheet; a sheet holding a value of a type _tag does not know is not cached
+        '''
+        try:
+            table = frame_to_table(excel_ptr, listof_ver)
+        except TypeError:
+            return
+        path = self._path(file_id, modified_time, sheet_name)
+        version_dir = os.path.dirname(path)
+        os.makedirs(version_dir, exist_ok=True)
+
+        with atomic_write(path) as sink:
+            with pa.ipc.new_file(sink, table.schema) as writer:
+                writer.write_table(table)
+
+        with self._lock:
+            # Older modifiedTime of the same file will never be asked for again
+            file_dir = os.path.dirname(version_dir)
+            for name in os.listdir(file_dir):
+                if os.path.join(file_dir, name) != version_dir:
+                    shutil.rmtree(os.path.join(file_dir, name), ignore_errors=True)
+            self.evict()
+
+    def remove(self, file_id, sheet_name=None):
+        '''
+        Drop a cached sheet (every version of it), or every sheet of the file
+        '''
+        file_dir = os.path.join(self.cache_dir, file_id)
+        with self._lock:
+            if sheet_name is None:
+                shutil.rmtree(file_dir, ignore_errors=True)
+                return
+            for version in os.listdir(file_dir) if os.path.isdir(file_dir) else []:
+                remove_file(os.path.join(file_dir, version, f'{_digest(sheet_name)}.arrow'))
+
+    def evict(self):
+        '''
+        Remove least recently used sheets until the cache fits in max_bytes
+        '''
+        evict_lru(
+            (os.path.join(root, name) for root, _, names in os.walk(self.cache_dir) for name in names if name.endswith('.arrow')),
+            self.max_bytes
+        )
+
+
+@st.cache_resource
+def get_sheet_cache(cache_dir=CACHE_DIR, max_bytes=CACHE_MAX_BYTES):
+    '''
+    One sheetFrameCache per process
+    '''
+    return sheetFrameCache(cache_dir, max_bytes)
@@ -0,0 +1,81 @@
+import numpy as np
+import pandas as pd
+
+# Status per PTR version lives in 'Status <version>' columns, split by the OS column
+STATUS_PREFIX = 'Status '
+PLATFORMS = ['Android', 'iOS']
+MISSING_STATUS = 'N/A'
+
+MATRIX_COLUMNS = ['Version', 'Platform', 'Status', 'Count', 'Percentage']
+
+
+def status_columns(excel_ptr, versions):
+    '''
+    {version: 'Status <version>'} for the versions that have a status column in the sheet
+    '''
+    return {version: STATUS_PREFIX + version for version in versions if STATUS_PREFIX + version in excel_ptr.columns}
+
+
+def build_status_matrix(excel_ptr, versions):
+    '''
+    Status percentages of every version x platform in one pass, as a long table
+    (Version, Platform, Status, Count, Percentage).
+
+    Empty status cells count as 'N/A' (like the page shows them). Within each version / platform
+    the statuses are ordered like value_counts: most frequent first, ties in order of first appearance.
+    '''
+    columns = status_columns(excel_ptr, versions)
+    if not columns or 'OS' not in excel_ptr.columns:
+        return pd.DataFrame(columns=MATRIX_COLUMNS)
+
+    os_column = excel_ptr['OS'].to_numpy(dtype=object)
+    platform_codes = np.full(len(os_column), -1)
+    for code, platform in enumerate(PLATFORMS):
+        platform_codes[os_column == platform] = code
+    on_platform = platform_codes >= 0
+    platform_codes = platform_codes[on_platform]
+
+    # Every (version, platform, status) cell gets one integer key, counted in a single np.unique pass
+    statuses = pd.Series(
+        np.concatenate([excel_ptr[column].to_numpy(dtype=object)[on_platform] for column in columns.values()]),
+        dtype=object
+    ).fillna(MISSING_STATUS)
+    status_codes, status_labels = pd.factorize(statuses)
+    group_codes = np.repeat(np.arange(len(columns)), len(platform_codes)) * len(PLATFORMS) + np.tile(platform_codes, len(columns))
+    keys = group_codes * len(status_labels) + status_codes
+
+    # Cells are stacked version by version in row order, so the first index of a key is its first appearance
+    present, first_seen, counts = np.unique(keys, return_index=True, return_counts=True)
+    group, status = np.divmod(present, len(status_labels))
+    version, platform = np.divmod(group, len(PLATFORMS))
+
+    matrix = pd.DataFrame({
+        'Version': np.asarray(list(columns), dtype=object)[version],
+        'Platform': np.asarray(PLATFORMS, dtype=object)[platform],
+        'Status': np.asarray(status_labels, dtype=object)[status],
+        'Count': counts,
+        'First': first_seen,
+        'Group': group,
+    })
+    totals = matrix.groupby('Group')['Count'].transform('sum')
+    # Same arithmetic as value_counts(normalize=True) * 100, rounded like round(x, 2)
+    matrix['Percentage'] = [round(value, 2) for value in (matrix['Count'] / totals * 100)]
+
+    matrix = matrix.sort_values(['Group', 'Count', 'First'], ascending=[True, False, True], kind='stable')
+    return matrix[MATRIX_COLUMNS].reset_index(drop=True)
+
+
+def version_status(status_matrix, version):
+    '''
+    Percentages of one version, in the layout the progress chart uses:
+    Status, Platform, Percentage with Android rows then iOS rows over the same statuses
+    (NaN where a status does not occur on that platform)
+    '''
+    rows = status_matrix[status_matrix['Version'] == version]
+    by_platform = [
+        rows[rows['Platform'] == platform].set_index('Status')['Percentage'].rename(platform)
+        for platform in PLATFORMS
+    ]
+    df_plot = pd.concat(by_platform, axis=1).rename_axis('Status').reset_index()
+    df_plot = df_plot.melt(id_vars='Status', var_name='Platform', value_name='Percentage')
+    return df_plot
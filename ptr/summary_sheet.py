@@ -0,0 +1,88 @@
+import pandas as pd
+
+# The '-' sheet holds one block per platform: a header row (first cell = block name, then the metric
+# names) followed by one row per PTR sheet with fractions; blocks are separated by empty rows
+SUMMARY_PLATFORMS = ['Android', 'iOS', 'Backoffice']
+PLATFORM_ALIASES = {
+    'Android': ['android'],
+    'iOS': ['ios'],
+    'Backoffice': ['backoffice', 'back office', 'back-office', 'bo'],
+}
+
+SUMMARY_COLUMNS = ['Platform', 'Sheet name', 'Metric', 'Value']
+
+
+def _blocks(raw_sheet):
+    '''
+    (start, stop) row positions of the runs of non-empty rows
+    '''
+    filled = raw_sheet.notna().any(axis=1).to_numpy()
+    blocks = []
+    start = None
+    for position, is_filled in enumerate(filled):
+        if is_filled and start is None:
+            start = position
+        elif not is_filled and start is not None:
+            blocks.append((start, position))
+            start = None
+    if start is not None:
+        blocks.append((start, len(filled)))
+    return blocks
+
+
+def _block_platform(header, used=()):
+    '''
+    Platform named by a whole cell of the header row of a block (not yet taken by an earlier block),
+    None when the header does not say. Only whole cells count, so a metric such as 'Total Scenarios'
+    is not read as iOS
+    '''
+    for value in header:
+        if not isinstance(value, str):
+            continue
+        text = value.strip().lower()
+        for platform, aliases in PLATFORM_ALIASES.items():
+            if platform not in used and text in aliases:
+                return platform
+    return None
+
+
+def parse_summary_sheet(raw_sheet):
+    '''
+    Tidy table (Platform, Sheet name, Metric, Value in percent) from the raw '-' sheet (read with header=None).
+
+    Blocks are found by the empty rows between them, so sheets added to a release (longer blocks)
+    need no change; a block is labelled by the platform named in its header row, otherwise by its
+    position (the first of Android, iOS, Backoffice not labelled yet); each platform labels one block.
+    '''
+    tables = []
+    used = set()
+    for start, stop in _blocks(raw_sheet):
+        header = raw_sheet.iloc[start].tolist()
+        platform = _block_platform(header, used) or next((name for name in SUMMARY_PLATFORMS if name not in used), None)
+        if platform is None or stop - start < 2:
+            continue
+        used.add(platform)
+
+        rows = raw_sheet.iloc[start + 1:stop]
+        for position in range(1, len(header)):
+            values = pd.to_numeric(rows.iloc[:, position], errors='coerce')
+            if pd.isna(header[position]) and values.isna().all():
+                continue  # column of another, wider block
+            tables.append(pd.DataFrame({
+                'Platform': platform,
+                'Sheet name': rows.iloc[:, 0].to_numpy(),
+                'Metric': header[position],
+                'Value': values.to_numpy() * 100,
+            }))
+
+    if not tables:
+        return pd.DataFrame(columns=SUMMARY_COLUMNS)
+    return pd.concat(tables, ignore_index=True)[SUMMARY_COLUMNS]
+
+
+def summary_heatmap(summary, platform):
+    '''
+    Sheet name x Metric grid of one platform, as the heatmap draws it
+    '''
+    rows = summary[summary['Platform'] == platform]
+    return rows.pivot(index='Sheet name', columns='Metric', values='Value')
@@ -0,0 +1,185 @@
+import importlib.util
+import threading
+
+import pandas as pd
+
+from Components.memory_cache import size_of
+from Components.single_flight import singleFlight
+
+# Summary sheet behind the heatmaps
+SUMMARY_SHEET = '-'
+
+# Excel readers: calamine (python-calamine, Rust) is ~9x faster on our workbooks but optional,
+# openpyxl (pandas' default, read-only mode) always works and is the fallback
+FAST_ENGINE = 'calamine'
+FALLBACK_ENGINE = 'openpyxl'
+
+
+def default_engine():
+    '''
+    calamine when python-calamine is installed, otherwise openpyxl
+    '''
+    if importlib.util.find_spec('python_calamine') is not None:
+        return FAST_ENGINE
+    return FALLBACK_ENGINE
+
+
+# Header row: the first of the leading rows with a cell containing 'Features'
+HEADER_MARKER = 'Features'
+HEADER_SCAN_ROWS = 20
+
+# Column 1 labels naming the PTR versions
+VERSION_MARKER = 'PTR Ver'
+
+COLUMN_RENAMES = {
+    'Sub Fitur': 'Sub-features',
+    'Rekening Sumber\n[Jika ada]': 'Rekening Sumber',
+    'Data yang Digunakan\n[Jika ada]': 'Data yang digunakan',
+    'FT\n[Jika Ada]': 'FT',
+    # 'Tanggal Eksekusi\n[harus diisi]': 'Tanggal Eksekusi',
+    # 'Tanggal Passed\n[harus diisi]': 'Tanggal Passed'
+}
+
+
+def find_header_row(excel_ptr):
+    '''
+    Position of the header row among the first HEADER_SCAN_ROWS rows, 0 when no 'Features' cell is found
+    '''
+    for position, row in enumerate(excel_ptr.head(HEADER_SCAN_ROWS).itertuples(index=False, name=None)):
+        if any(isinstance(value, str) and HEADER_MARKER in value for value in row):
+            return position
+    return 0
+
+
+def clean_ptr_sheet(excel_ptr):
+    '''
+    Clean a raw sheet (read with header=None) into the PTR frame, returns (excel_ptr, listof_ver).
+    The raw sheet is not modified; only the final frame is copied out of it.
+    '''
+    # Only column 1 carries the version labels, and forward filling cannot add a label that is not
+    # already in it, so the distinct labels (in order of appearance) come straight from the raw column
+    version_column = excel_ptr[1]
+    listof_ver = version_column[version_column.str.contains(VERSION_MARKER, na=False)].unique().tolist()
+
+    header_index = find_header_row(excel_ptr)
+    new_header = excel_ptr.iloc[header_index].values
+
+    # Column 0 (row numbers) and 'No' columns are dropped; the rest is sliced out in one go
+    positions = [position for position in range(1, len(new_header)) if new_header[position] != 'No']
+    excel_ptr = excel_ptr.iloc[header_index+1:, positions]
+    excel_ptr.columns = new_header[positions]
+    excel_ptr.reset_index(drop=True, inplace=True)
+
+    # Convert column OS Version types (the page warns when the column is missing)
+    if 'OS Version' in excel_ptr.columns:
+        excel_ptr['OS Version'] = excel_ptr['OS Version'].astype(str)
+
+    excel_ptr.rename(columns=COLUMN_RENAMES, inplace=True)
+
+    # Define the columns to ffill
+    columns_to_ffill = ['Features', 'Sub-features', 'Expected Condition']
+
+    # Check if 'Link JIRA' exists in the dataframe
+    if 'Link JIRA' in excel_ptr.columns:
+        columns_to_ffill.append('Link JIRA')
+
+    # Apply ffill only on the selected columns
+    excel_ptr[columns_to_ffill] = excel_ptr[columns_to_ffill].ffill()
+
+    return excel_ptr, listof_ver
+
+
+class ptrWorkbook:
+    '''
+    A PTR workbook opened once from its bytes.
+
+    pandas keeps the workbook (calamine, or openpyxl in read-only streaming mode) open inside the
+    ExcelFile, so listing the sheets, the processed PTR sheets and the '-' summary sheet all come
+    from that one load, and every sheet is parsed at most once. engine=None picks the fastest
+    installed engine; a sheet the fast engine fails on is read again with openpyxl.
+    '''
+
+    def __init__(self, file_data, engine=None):
+        self._file_data = file_data
+        self.engine = engine or default_engine()
+        try:
+            self._excel = pd.ExcelFile(file_data, engine=self.engine)
+        except Exception:
+            if self.engine == FALLBACK_ENGINE:
+                raise
+            self.engine = FALLBACK_ENGINE
+            self._excel = self._open(FALLBACK_ENGINE)
+        self._fallback_excel = None
+        self.sheet_names = self._excel.sheet_names
+        self._raw_sheets = {}
+        self._ptr_sheets = {}
+        self._sizes = {}  # bytes of each parsed sheet, measured once for nbytes()
+        self._flights = singleFlight()  # the page and the prefetch pool asking for the same sheet
+        # openpyxl's read-only reader is not safe to share between threads
+        self._lock = threading.Lock()
+
+    def _open(self, engine):
+        if hasattr(self._file_data, 'seek'):
+            self._file_data.seek(0)
+        return pd.ExcelFile(self._file_data, engine=engine)
+
+    def _parse(self, sheet_name):
+        if sheet_name not in self.sheet_names:
+            raise ValueError(f"Worksheet named '{sheet_name}' not found")
+        try:
+            return self._excel.parse(sheet_name, header=None)
+        except Exception:
+            if self.engine == FALLBACK_ENGINE:
+                raise
+            # Something the fast engine cannot read, openpyxl gets a second chance
+            if self._fallback_excel is None:
+                self._fallback_excel = self._open(FALLBACK_ENGINE)
+            return self._fallback_excel.parse(sheet_name, header=None)
+
+    def raw_sheet(self, sheet_name):
+        '''
+        Sheet as read with header=None; shared, so callers must not modify it
+        '''
+        with self._lock:
+            if sheet_name not in self._raw_sheets:
+                self._raw_sheets[sheet_name] = self._parse(sheet_name)
+            return self._raw_sheets[sheet_name]
+
+    def ptr_sheet(self, sheet_name, keep=True):
+        '''
+        (excel_ptr, listof_ver) for a PTR sheet, see clean_ptr_sheet. Once cleaned the raw frame is
+        dropped; keep=False also leaves the result out of the workbook (the caller caches it itself)
+        '''
+        if sheet_name in self._ptr_sheets:
+            return self._ptr_sheets[sheet_name]
+        return self._flights.do(sheet_name, lambda: self._clean(sheet_name, keep))
+
+    def _clean(self, sheet_name, keep):
+        if sheet_name in self._ptr_sheets:
+            return self._ptr_sheets[sheet_name]
+        sheet = clean_ptr_sheet(self.raw_sheet(sheet_name))
+        if sheet_name != SUMMARY_SHEET:
+            with self._lock:
+                self._raw_sheets.pop(sheet_name, None)  # never read again once cleaned
+        if keep:
+            self._ptr_sheets[sheet_name] = sheet
+        return sheet
+
+    def summary_sheet(self):
+        return self.raw_sheet(SUMMARY_SHEET)
+
+    def nbytes(self):
+        '''
+        Memory held by the workbook: the file bytes (a stand-in for the reader's own copy) plus
+        the sheets it still holds (raw '-' sheet, raw sheets that are not PTR sheets, kept PTR
+        sheets), used by the byte budget of the memory cache
+        '''
+        with self._lock:
+            parsed = [(('raw', name), frame) for name, frame in self._raw_sheets.items()]
+        parsed += [(('ptr', name), sheet) for name, sheet in list(self._ptr_sheets.items())]
+        total = size_of(self._file_data)
+        for key, value in parsed:
+            if key not in self._sizes:
+                self._sizes[key] = size_of(value)
+            total += self._sizes[key]
+        return total